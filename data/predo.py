@@ -1,61 +1,86 @@
 import os
-import re
+import sys
 from flask import Flask, request, jsonify
-import joblib
-from sentence_transformers import SentenceTransformer
-import numpy as np
+
+# Share the batched risk engine with the main analysis service
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python'))
+from risk_engine import RiskScorer
+from batching import MicroBatcher
+from text_processing import clause_spans, split_into_clauses
 
 app = Flask(__name__)
 
 # Load the pre-trained classifier and the SentenceTransformer model
 classifier_path = './risk_classifier.pkl'  # Path to your saved classifier model
-if os.path.exists(classifier_path):
-    classifier = joblib.load(classifier_path)
-else:
-    raise FileNotFoundError(f"Classifier model file not found at {classifier_path}")
-
-# Load the Sentence Transformer model for embedding generation
-model = SentenceTransformer('all-MiniLM-L6-v2')
+risk_scorer = RiskScorer.from_paths(classifier_path, 'all-MiniLM-L6-v2')
 
-def preprocess_text(text):
-    """Clean and preprocess the text data."""
-    text = str(text).lower()
-    text = re.sub(r'[^a-zA-Z\s]', '', text)  # Remove special characters
-    text = ' '.join(text.split())  # Remove extra whitespace
-    return text
+# Concurrent /predict requests are scored together in one encode + predict pass;
+# RISK_BATCH_MAX_WAIT_MS bounds how long the first request of a batch waits for company
+risk_batcher = MicroBatcher(
+    risk_scorer.score,
+    max_batch_size=int(os.getenv('RISK_BATCH_MAX_SIZE', '32')),
+    max_wait_ms=float(os.getenv('RISK_BATCH_MAX_WAIT_MS', '5')),
+    name='risk-batcher'
+)
 
 def analyze_new_clause(clause_text):
     """Analyze a new clause and predict its risk level."""
-    # Preprocess the new text
-    processed_text = preprocess_text(clause_text)
-    
-    # Generate embedding for the new clause
-    new_embedding = model.encode([processed_text], convert_to_tensor=True)
-    
-    # Predict risk level
-    risk_level = classifier.predict(new_embedding)[0]
-    
-    return risk_level
+    return risk_batcher.submit([clause_text])[0]['risk_level']
 
 @app.route('/predict', methods=['POST'])
 def predict_risk_level():
-    """API endpoint to predict the risk level of a clause."""
+    """API endpoint to predict the risk level of a clause, a list of clauses or a whole document."""
     try:
         # Get the input data (JSON format)
         data = request.get_json()
         clause_text = data.get('clause_text')
-        
+        clauses = data.get('clauses')
+        document = data.get('text')
+
+        if document is not None:
+            if not isinstance(document, str):
+                return jsonify({"error": "text must be a string"}), 400
+
+            # Segment in one pass and return offsets into the submitted text
+            spans = list(clause_spans(document))
+            results = risk_batcher.submit(split_into_clauses(document, spans))
+            return jsonify({
+                "results": [
+                    {"start": span.start, "end": span.end, **result}
+                    for span, result in zip(spans, results)
+                ]
+            }), 200
+
+        if clauses is not None:
+            if not isinstance(clauses, list) or not all(isinstance(c, str) for c in clauses):
+                return jsonify({"error": "clauses must be a list of strings"}), 400
+
+            # Score the whole list in one batch, shared with concurrent requests
+            results = risk_batcher.submit(clauses)
+            return jsonify({
+                "results": [
+                    {"clause_text": clause, **result}
+                    for clause, result in zip(clauses, results)
+                ]
+            }), 200
+
         if not clause_text:
             return jsonify({"error": "No clause_text provided"}), 400
-        
+
         # Predict risk level
-        risk_level = analyze_new_clause(clause_text)
-        
+        result = risk_batcher.submit([clause_text])[0]
+
         # Return the prediction as a JSON response
-        return jsonify({"risk_level": risk_level}), 200
-    
+        return jsonify(result), 200
+
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Batch sizes, queue wait and end-to-end latency percentiles of the scoring queue"""
+    return jsonify(risk_batcher.stats()), 200
+
 if __name__ == '__main__':
-    app.run(debug=True)
+    # Threaded so concurrent requests can share a batch
+    app.run(debug=True, threaded=True)
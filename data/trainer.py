@@ -6,7 +6,12 @@ from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import accuracy_score
 import joblib
 import nltk
-import re
+import os
+import sys
+
+# Share the single-pass preprocessing used at inference time
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python'))
+from text_processing import preprocess_text
 
 # Download required NLTK data
 nltk.download('stopwords')
@@ -32,16 +37,6 @@ def load_csv_data(file_path):
     except Exception as e:
         raise Exception(f"Error reading CSV file: {str(e)}")
 
-def preprocess_text(text):
-    """Clean and preprocess the text data."""
-    # Convert to lowercase
-    text = str(text).lower()
-    # Remove special characters and numbers
-    text = re.sub(r'[^a-zA-Z\s]', '', text)
-    # Remove extra whitespace
-    text = ' '.join(text.split())
-    return text
-
 def generate_embeddings(df, model):
     """Generate embeddings for the clause texts."""
     clauses = df['Clause Text'].apply(preprocess_text).tolist()
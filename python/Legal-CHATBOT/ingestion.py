@@ -1,52 +1,199 @@
+import argparse
+import hashlib
+import json
 import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from langchain_community.vectorstores import FAISS
-from langchain_community.document_loaders import PyPDFDirectoryLoader
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
+from langchain_community.document_loaders import PyPDFLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from dotenv import load_dotenv
 
+# Shared retrieval helpers live in the parent python/ directory
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from embeddings import embedding_config_of, get_embeddings
+from vector_store import load_vector_store, save_vector_store
+from ann_index import INDEX_KINDS, ann_index_name, build_ann_store, rebuild_ann_variants
+
 # Set up environment variables
 load_dotenv()
 os.environ['GOOGLE_API_KEY'] = os.getenv("GOOGLE_API_KEY")
 
-# Load and embed the documents
-def embed_and_save_documents():
-    embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
-    loader = PyPDFDirectoryLoader("./LEGAL-DATA")
-    print("Loader initialised")
-    docs = loader.load()
-    print("Loading the docs")
-    
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-    final_documents = text_splitter.split_documents(docs)
-    print("Splitting the docs")
-    
+MANIFEST_FILE = "manifest.json"
+
+
+def file_fingerprint(path):
+    """Hash a file's bytes so unchanged PDFs are skipped on re-ingestion"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_id(source, index, text):
+    """Deterministic id for a chunk, derived from its file, position and content"""
+    return hashlib.sha256(f"{source}\x1f{index}\x1f{text}".encode("utf-8")).hexdigest()[:32]
+
+
+def load_and_split(path, chunk_size=1000, chunk_overlap=200):
+    """Parse and split one PDF; runs inside a worker process"""
+    docs = PyPDFLoader(path).load()
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    chunks = text_splitter.split_documents(docs)
     # Ensure metadata includes the source file name
-    for doc in final_documents:
-        if 'source' in doc.metadata:
-            source_file = doc.metadata['source']
-            doc.metadata['source'] = os.path.basename(source_file)
-        else:
-            # If source metadata is not present, add it
-            doc.metadata['source'] = os.path.basename(loader.directory)
-    
-    # Ensure the payload size is within limits by batching the documents
-    batch_size = 100  # Adjust batch size as needed
-    batched_documents = [final_documents[i:i + batch_size] for i in range(0, len(final_documents), batch_size)]
-    vector_stores = []
-    for batch in batched_documents:
-        vector_store = FAISS.from_documents(batch, embeddings)
-        vector_stores.append(vector_store)
-    print("created batched documents")
-    
-    # Merge the vector stores
-    vectors = vector_stores[0]
-    for vector_store in vector_stores[1:]:
-        vectors.merge_from(vector_store)
-    print("merged the vectors")
+    for doc in chunks:
+        doc.metadata['source'] = os.path.basename(path)
+    return chunks
+
+
+def read_manifest(store_path):
+    manifest_path = os.path.join(store_path, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path) as f:
+        return json.load(f)
+
+
+def write_manifest(store_path, manifest):
+    with open(os.path.join(store_path, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def plan_ingestion(data_dir, manifest):
+    """Split the PDFs on disk into new/changed files to embed and stale entries to drop"""
+    known = manifest["files"] if manifest else {}
+    on_disk = {
+        name: os.path.join(data_dir, name)
+        for name in sorted(os.listdir(data_dir))
+        if name.lower().endswith(".pdf")
+    }
+
+    to_embed = {}
+    for name, path in on_disk.items():
+        fingerprint = file_fingerprint(path)
+        if known.get(name, {}).get("sha256") != fingerprint:
+            to_embed[name] = (path, fingerprint)
+
+    stale = [name for name in known if name not in on_disk or name in to_embed]
+    return to_embed, stale
+
+
+# Load and embed the documents
+def embed_and_save_documents(data_dir="./LEGAL-DATA", store_path="my_vector_store",
+                             parse_workers=None, embed_concurrency=4, batch_size=100, full=False,
+                             ann_kind=None, pq_m=0):
+    start = time.perf_counter()
+    embeddings = get_embeddings()
+    embedding_config = embedding_config_of(embeddings)
+
+    manifest = None if full else read_manifest(store_path)
+    # A store built with another backend, or without a manifest, cannot be appended to
+    if manifest and manifest.get("embedding") != embedding_config:
+        print("Embedding backend changed, rebuilding the whole store")
+        manifest = None
+
+    vectors = None
+    if manifest and os.path.exists(store_path):
+        # Always append to the flat index; ANN variants are derived from it
+        vectors = load_vector_store(store_path, embeddings, index_name="index", writable=True)
+    else:
+        manifest = None
+
+    to_embed, stale = plan_ingestion(data_dir, manifest)
+    files = dict(manifest["files"]) if manifest else {}
+    print(f"{len(to_embed)} new or changed files, {len(stale)} stale entries")
+
+    # Drop chunks of files that changed or disappeared
+    if vectors is not None and stale:
+        stale_ids = [cid for name in stale for cid in files[name]["chunk_ids"]]
+        if stale_ids:
+            vectors.delete(stale_ids)
+        for name in stale:
+            files.pop(name)
+
+    if not to_embed and not stale:
+        print("Vector store is up to date")
+        if ann_kind and vectors is not None:
+            build_ann_store(vectors, store_path, ann_kind, pq_m=pq_m)
+        return vectors
+
+    # Parse PDFs in parallel processes
+    names = list(to_embed)
+    with ProcessPoolExecutor(max_workers=parse_workers) as pool:
+        parsed = list(pool.map(load_and_split, [to_embed[name][0] for name in names]))
+    print("Loaded and split the docs")
+
+    documents, ids = [], []
+    for name, chunks in zip(names, parsed):
+        chunk_ids = [chunk_id(name, i, doc.page_content) for i, doc in enumerate(chunks)]
+        pages = [doc.metadata.get("page") for doc in chunks if doc.metadata.get("page") is not None]
+        files[name] = {
+            "sha256": to_embed[name][1],
+            "chunk_ids": chunk_ids,
+            "chunks": len(chunk_ids),
+            "pages": [min(pages), max(pages)] if pages else None,
+            "ingested_at": time.time()
+        }
+        documents.extend(chunks)
+        ids.extend(chunk_ids)
+
+    # Nothing to build a new store from, e.g. only image-only PDFs without extractable text
+    if vectors is None and not documents:
+        print("No text chunks found in the new files, vector store not created")
+        return None
+
+    # Ensure the payload size is within limits by batching the documents,
+    # with a bounded number of embedding requests in flight
+    batches = [range(i, min(i + batch_size, len(documents))) for i in range(0, len(documents), batch_size)]
+    with ThreadPoolExecutor(max_workers=embed_concurrency) as pool:
+        embedded = pool.map(
+            lambda batch: embeddings.embed_documents([documents[i].page_content for i in batch]),
+            batches
+        )
+        # Append in order on this thread; FAISS adds are not thread-safe
+        for batch, batch_vectors in zip(batches, embedded):
+            pairs = [(documents[i].page_content, v) for i, v in zip(batch, batch_vectors)]
+            metadatas = [documents[i].metadata for i in batch]
+            batch_ids = [ids[i] for i in batch]
+            if vectors is None:
+                vectors = FAISS.from_embeddings(pairs, embeddings, metadatas=metadatas, ids=batch_ids)
+            else:
+                vectors.add_embeddings(pairs, metadatas=metadatas, ids=batch_ids)
+    print("Embedded the new chunks")
+
+    # Save the vector store and manifest to disk
+    save_vector_store(vectors, store_path)
+    write_manifest(store_path, {"embedding": embedding_config, "files": files})
     
-    # Save the vector store to disk
-    vectors.save_local("my_vector_store")
-    print("vectors saved")
+    # Keep existing IVF/HNSW variants in sync and build a new one if requested
+    rebuilt = rebuild_ann_variants(vectors, store_path)
+    if ann_kind and ann_index_name(ann_kind, pq_m) not in rebuilt:
+        build_ann_store(vectors, store_path, ann_kind, pq_m=pq_m)
+    print(f"vectors saved in {time.perf_counter() - start:.1f}s")
+    return vectors
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incrementally embed the PDFs in LEGAL-DATA")
+    parser.add_argument("--data-dir", default="./LEGAL-DATA")
+    parser.add_argument("--store", default="my_vector_store")
+    parser.add_argument("--parse-workers", type=int, default=None)
+    parser.add_argument("--embed-concurrency", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--full", action="store_true", help="Ignore the manifest and rebuild everything")
+    parser.add_argument("--ann", choices=INDEX_KINDS, default=None, help="Also build an IVF or HNSW index")
+    parser.add_argument("--pq-m", type=int, default=0, help="Product-quantization sub-vectors for --ann")
+    args = parser.parse_args()
 
-embed_and_save_documents()
+    embed_and_save_documents(
+        data_dir=args.data_dir,
+        store_path=args.store,
+        parse_workers=args.parse_workers,
+        embed_concurrency=args.embed_concurrency,
+        batch_size=args.batch_size,
+        full=args.full,
+        ann_kind=args.ann,
+        pq_m=args.pq_m
+    )
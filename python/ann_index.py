@@ -0,0 +1,185 @@
+"""Build approximate-nearest-neighbour variants of a flat FAISS store.
+
+The flat index stays the source of truth (incremental ingestion appends to
+it); ANN variants are derived from its vectors and saved next to it under
+their own index name, e.g. index_ivf.faiss, sharing the store's docstore
+since index positions are identical. Services pick one
+with FAISS_INDEX_NAME and tune it with FAISS_NPROBE / FAISS_EF_SEARCH.
+
+Usage:
+    python ann_index.py my_vector_store --kind ivf --pq-m 16
+    python ann_index.py faiss_index --kind hnsw
+"""
+import argparse
+import json
+import math
+import os
+import time
+from typing import Dict, Optional
+
+import faiss
+import numpy as np
+from langchain_community.vectorstores import FAISS
+
+ANN_CONFIG_FILE = 'ann.json'
+INDEX_KINDS = ('ivf', 'hnsw')
+
+
+def default_nlist(ntotal: int) -> int:
+    """Rule of thumb: about 4 * sqrt(n) lists, with at least ~39 training points per list"""
+    return max(1, min(int(4 * math.sqrt(ntotal)), ntotal // 39 or 1))
+
+
+def build_ann_index(vectors: np.ndarray, kind: str = 'ivf', metric: int = faiss.METRIC_L2,
+                    nlist: Optional[int] = None, pq_m: int = 0, pq_bits: int = 8,
+                    hnsw_m: int = 32, ef_construction: int = 200) -> faiss.Index:
+    """Train and fill an IVF or HNSW index, optionally product-quantized"""
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    ntotal, d = vectors.shape
+    if pq_m and d % pq_m:
+        raise ValueError(f"pq_m={pq_m} must divide the embedding dimension {d}")
+
+    if kind == 'ivf':
+        nlist = nlist or default_nlist(ntotal)
+        quantizer = faiss.IndexFlat(d, metric)
+        if pq_m:
+            index = faiss.IndexIVFPQ(quantizer, d, nlist, pq_m, pq_bits, metric)
+        else:
+            index = faiss.IndexIVFFlat(quantizer, d, nlist, metric)
+    elif kind == 'hnsw':
+        if pq_m:
+            if metric != faiss.METRIC_L2:
+                raise ValueError("HNSW with product quantization only supports L2 stores")
+            index = faiss.IndexHNSWPQ(d, pq_m, hnsw_m)
+        else:
+            index = faiss.IndexHNSWFlat(d, hnsw_m, metric)
+        index.hnsw.efConstruction = ef_construction
+    else:
+        raise ValueError(f"Unknown index kind: {kind}")
+
+    if not index.is_trained:
+        # Training on a bounded sample keeps build time predictable on large corpora
+        sample_size = min(ntotal, 256 * getattr(index, 'nlist', 256))
+        sample = vectors[np.random.default_rng(0).choice(ntotal, sample_size, replace=False)]
+        index.train(sample)
+    index.add(vectors)
+    return index
+
+
+def configure_index(index: faiss.Index, nprobe: Optional[int] = None, ef_search: Optional[int] = None):
+    """Apply query-time recall/latency knobs to an IVF or HNSW index"""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None and nprobe:
+        ivf.nprobe = nprobe
+    if hasattr(index, 'hnsw') and ef_search:
+        index.hnsw.efSearch = ef_search
+
+
+def configure_from_env(index: faiss.Index, config: Optional[Dict] = None):
+    """Tune an index from FAISS_NPROBE / FAISS_EF_SEARCH, falling back to the saved build config"""
+    config = config or {}
+    nprobe = os.getenv('FAISS_NPROBE') or config.get('nprobe')
+    ef_search = os.getenv('FAISS_EF_SEARCH') or config.get('ef_search')
+    configure_index(index, int(nprobe) if nprobe else None, int(ef_search) if ef_search else None)
+
+
+def stored_vectors(store: FAISS) -> np.ndarray:
+    """Read every vector back out of a flat store, in index position order"""
+    return store.index.reconstruct_n(0, store.index.ntotal)
+
+
+def to_ann_store(store: FAISS, kind: str = 'ivf', **kwargs) -> FAISS:
+    """Derive an ANN store that shares the flat store's docstore and position mapping"""
+    index = build_ann_index(stored_vectors(store), kind, metric=store.index.metric_type, **kwargs)
+    return FAISS(
+        embedding_function=store.embedding_function,
+        index=index,
+        docstore=store.docstore,
+        index_to_docstore_id=dict(store.index_to_docstore_id),
+        normalize_L2=store._normalize_L2,
+        distance_strategy=store.distance_strategy
+    )
+
+
+def read_ann_config(store_path: str, index_name: str) -> Dict:
+    path = os.path.join(store_path, ANN_CONFIG_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f).get(index_name, {})
+
+
+def write_ann_config(store_path: str, index_name: str, config: Dict):
+    path = os.path.join(store_path, ANN_CONFIG_FILE)
+    configs = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            configs = json.load(f)
+    configs[index_name] = config
+    with open(path, 'w') as f:
+        json.dump(configs, f, indent=2)
+
+
+def ann_index_name(kind: str, pq_m: int = 0) -> str:
+    return f"index_{kind}" + (f"_pq{pq_m}" if pq_m else "")
+
+
+def build_ann_store(store: FAISS, store_path: str, kind: str = 'ivf', nlist: Optional[int] = None,
+                    pq_m: int = 0, hnsw_m: int = 32, nprobe: int = 16, ef_search: int = 64) -> str:
+    """Build an ANN variant of a loaded flat store and save it as index_<kind>[_pq]"""
+    index_name = ann_index_name(kind, pq_m)
+    ann_store = to_ann_store(store, kind, nlist=nlist, pq_m=pq_m, hnsw_m=hnsw_m)
+    faiss.write_index(ann_store.index, os.path.join(store_path, f"{index_name}.faiss"))
+
+    ivf = faiss.try_extract_index_ivf(ann_store.index)
+    write_ann_config(store_path, index_name, {
+        'kind': kind,
+        'nlist': ivf.nlist if ivf is not None else None,
+        'pq_m': pq_m,
+        'hnsw_m': hnsw_m if kind == 'hnsw' else None,
+        'nprobe': nprobe if kind == 'ivf' else None,
+        'ef_search': ef_search if kind == 'hnsw' else None,
+        'ntotal': ann_store.index.ntotal
+    })
+    return index_name
+
+
+def rebuild_ann_variants(store: FAISS, store_path: str):
+    """Rebuild every ANN variant recorded in ann.json after the flat store changed"""
+    path = os.path.join(store_path, ANN_CONFIG_FILE)
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        configs = json.load(f)
+    for index_name, config in configs.items():
+        # Let nlist re-derive from the new corpus size
+        build_ann_store(store, store_path, config['kind'], pq_m=config.get('pq_m') or 0,
+                        hnsw_m=config.get('hnsw_m') or 32, nprobe=config.get('nprobe') or 16,
+                        ef_search=config.get('ef_search') or 64)
+        print(f"Rebuilt {index_name}")
+    return list(configs)
+
+
+def main():
+    from vector_store import load_vector_store
+
+    parser = argparse.ArgumentParser(description="Build an IVF/HNSW variant of a flat FAISS store")
+    parser.add_argument("store", help="Vector store directory containing the flat index")
+    parser.add_argument("--kind", choices=INDEX_KINDS, default="ivf")
+    parser.add_argument("--nlist", type=int, default=None, help="IVF lists (default ~4*sqrt(n))")
+    parser.add_argument("--pq-m", type=int, default=0, help="Product-quantization sub-vectors (0 disables PQ)")
+    parser.add_argument("--hnsw-m", type=int, default=32)
+    parser.add_argument("--nprobe", type=int, default=16, help="Default IVF lists probed per query")
+    parser.add_argument("--ef-search", type=int, default=64, help="Default HNSW search breadth")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    store = load_vector_store(args.store, index_name="index")
+    index_name = build_ann_store(store, args.store, args.kind, args.nlist, args.pq_m,
+                                 args.hnsw_m, args.nprobe, args.ef_search)
+    print(f"Saved {index_name} ({store.index.ntotal} vectors) in {time.perf_counter() - start:.1f}s")
+    print(f"Serve it with FAISS_INDEX_NAME={index_name}")
+
+
+if __name__ == "__main__":
+    main()
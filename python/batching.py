@@ -0,0 +1,117 @@
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Sequence
+
+
+class MicroBatcher:
+    """Coalesce concurrent submissions into single calls of a batch function.
+
+    A worker thread takes the first queued request, then keeps collecting
+    requests until max_batch_size items are pending or max_wait_ms has passed
+    since that first request arrived. The batch function receives the
+    concatenated items and must return one result per item.
+    """
+    def __init__(self, fn: Callable[[List], Sequence], max_batch_size: int = 64,
+                 max_wait_ms: float = 5.0, name: str = 'batcher'):
+        self.fn = fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.name = name
+        self.requests = 0
+        self.items = 0
+        self.batches = 0
+        self.largest_batch = 0
+        self.queue_wait = 0.0
+        self.compute_time = 0.0
+        # End-to-end latency of recent submissions, for percentile reporting
+        self._latencies: deque = deque(maxlen=2048)
+        self._lock = threading.Lock()
+        self._queue: queue.Queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+
+    def submit(self, items: Sequence) -> List:
+        """Queue items for the next batch and block until their results are ready"""
+        if not items:
+            return []
+        future = Future()
+        queued = time.perf_counter()
+        self._queue.put((list(items), future, queued))
+        try:
+            return future.result()
+        finally:
+            with self._lock:
+                self._latencies.append(time.perf_counter() - queued)
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            pending = [first]
+            size = len(first[0])
+            deadline = first[2] + self.max_wait
+            while size < self.max_batch_size:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                pending.append(request)
+                size += len(request[0])
+            self._execute(pending)
+
+    def _execute(self, pending):
+        started = time.perf_counter()
+        items = [item for request_items, _, _ in pending for item in request_items]
+        try:
+            results = list(self.fn(items))
+            if len(results) != len(items):
+                raise RuntimeError(f"{self.name} returned {len(results)} results for {len(items)} items")
+        except Exception as e:
+            for _, future, _ in pending:
+                future.set_exception(e)
+            results = None
+        finished = time.perf_counter()
+
+        if results is not None:
+            offset = 0
+            for request_items, future, _ in pending:
+                future.set_result(results[offset:offset + len(request_items)])
+                offset += len(request_items)
+
+        with self._lock:
+            self.requests += len(pending)
+            self.items += len(items)
+            self.batches += 1
+            self.largest_batch = max(self.largest_batch, len(items))
+            self.queue_wait += sum(started - queued for _, _, queued in pending)
+            self.compute_time += finished - started
+
+    @staticmethod
+    def latency_percentile(latencies: List[float], percentile: float) -> float:
+        if not latencies:
+            return 0
+        index = min(len(latencies) - 1, int(round(percentile / 100 * (len(latencies) - 1))))
+        return round(1000 * latencies[index], 3)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            return {
+                'requests': self.requests,
+                'items': self.items,
+                'batches': self.batches,
+                'avg_batch_size': round(self.items / self.batches, 2) if self.batches else 0,
+                'largest_batch': self.largest_batch,
+                'avg_queue_wait_ms': round(1000 * self.queue_wait / self.requests, 3) if self.requests else 0,
+                'avg_batch_ms': round(1000 * self.compute_time / self.batches, 3) if self.batches else 0,
+                'p50_latency_ms': self.latency_percentile(latencies, 50),
+                'p99_latency_ms': self.latency_percentile(latencies, 99),
+                'queue_depth': self._queue.qsize(),
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000
+            }
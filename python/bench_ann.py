@@ -0,0 +1,92 @@
+"""Recall-vs-latency benchmark of IVF/HNSW indexes against the flat index of a store.
+
+Queries are stored vectors with a little noise added, so the benchmark runs
+offline and needs no embedding backend.
+
+Usage:
+    python bench_ann.py my_vector_store --queries 200 --k 5
+"""
+import argparse
+import time
+
+import faiss
+import numpy as np
+from ann_index import build_ann_index, configure_index, stored_vectors
+from rebuild_index import _NoEmbeddings
+from vector_store import load_vector_store
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    hits = sum(len(set(f[f >= 0]) & set(t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def time_queries(index: faiss.Index, queries: np.ndarray, k: int):
+    """Search one query at a time, as the services do, and return results plus latencies"""
+    latencies = []
+    results = np.empty((len(queries), k), dtype=np.int64)
+    for i, query in enumerate(queries):
+        start = time.perf_counter()
+        _, ids = index.search(query[None, :], k)
+        latencies.append(time.perf_counter() - start)
+        results[i] = ids[0]
+    return results, np.array(latencies) * 1000
+
+
+def report(name: str, found: np.ndarray, truth: np.ndarray, latencies: np.ndarray, size: int):
+    print(f"{name:<28} recall={recall_at_k(found, truth):.3f}  "
+          f"p50={np.percentile(latencies, 50):.3f}ms  p99={np.percentile(latencies, 99):.3f}ms  "
+          f"size={size / 1e6:.1f}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ANN indexes against a flat FAISS store")
+    parser.add_argument("store", help="Vector store directory with a flat index")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--noise", type=float, default=0.05, help="Query perturbation relative to vector norm")
+    parser.add_argument("--pq-m", type=int, default=0, help="Also benchmark PQ variants with this many sub-vectors")
+    args = parser.parse_args()
+
+    store = load_vector_store(args.store, _NoEmbeddings(), index_name="index")
+    vectors = stored_vectors(store)
+    metric = store.index.metric_type
+    print(f"{store.index.ntotal} vectors of dimension {store.index.d}")
+
+    rng = np.random.default_rng(0)
+    picks = rng.choice(len(vectors), min(args.queries, len(vectors)), replace=False)
+    scale = args.noise * np.linalg.norm(vectors[picks], axis=1, keepdims=True) / np.sqrt(vectors.shape[1])
+    queries = (vectors[picks] + rng.normal(size=(len(picks), vectors.shape[1])) * scale).astype(np.float32)
+
+    truth, latencies = time_queries(store.index, queries, args.k)
+    report("flat", truth, truth, latencies, len(faiss.serialize_index(store.index)))
+
+    variants = [("ivf", 0), ("hnsw", 0)]
+    if args.pq_m:
+        variants += [("ivf", args.pq_m), ("hnsw", args.pq_m)]
+
+    for kind, pq_m in variants:
+        if kind == "hnsw" and pq_m and metric != faiss.METRIC_L2:
+            continue
+        start = time.perf_counter()
+        index = build_ann_index(vectors, kind, metric=metric, pq_m=pq_m)
+        label = kind + (f"+pq{pq_m}" if pq_m else "")
+        print(f"\n{label}: built in {time.perf_counter() - start:.1f}s")
+        size = len(faiss.serialize_index(index))
+
+        if kind == "ivf":
+            nlist = faiss.extract_index_ivf(index).nlist
+            sweep = [p for p in (1, 2, 4, 8, 16, 32, 64, 128) if p <= nlist]
+            for nprobe in sweep:
+                configure_index(index, nprobe=nprobe)
+                found, latencies = time_queries(index, queries, args.k)
+                report(f"  nprobe={nprobe}", found, truth, latencies, size)
+        else:
+            for ef_search in (16, 32, 64, 128, 256):
+                configure_index(index, ef_search=ef_search)
+                found, latencies = time_queries(index, queries, args.k)
+                report(f"  efSearch={ef_search}", found, truth, latencies, size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Accuracy-parity check and throughput benchmark of the ONNX risk encoder.
+
+Encodes the clauses of data/risk_data.csv with the PyTorch
+sentence-transformer and with the exported ONNX graphs (fp32 and int8),
+runs the risk classifier on each, and reports embedding cosine
+similarity, label agreement with the PyTorch path, accuracy and
+sentences/sec. Exits non-zero when int8 label agreement falls below
+--min-agreement.
+
+Usage:
+    python onnx_encoder.py
+    python bench_risk_encoder.py --csv ../data/risk_data.csv
+"""
+import argparse
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from onnx_encoder import OnnxEncoder
+from risk_engine import preprocess_text
+
+
+def throughput(encoder, texts, batch_size: int, repeat: int):
+    """Return embeddings and the best sentences/sec over a few timed runs"""
+    embeddings = encoder.encode(texts[:batch_size], batch_size=batch_size, convert_to_numpy=True)
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        embeddings = encoder.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+        best = min(best, time.perf_counter() - start)
+    return np.asarray(embeddings, dtype=np.float32), len(texts) / best
+
+
+def cosine(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return (a * b).sum(axis=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the ONNX/int8 risk encoder with PyTorch")
+    parser.add_argument("--csv", default=os.path.join('..', 'data', 'risk_data.csv'))
+    parser.add_argument("--classifier", default='./risk_classifier.pkl')
+    parser.add_argument("--model", default='all-MiniLM-L6-v2')
+    parser.add_argument("--onnx-dir", default=None, help="Export directory (default: onnx/<model>)")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--min-agreement", type=float, default=0.98)
+    args = parser.parse_args()
+
+    from sentence_transformers import SentenceTransformer
+
+    df = pd.read_csv(args.csv, dtype=str).dropna(subset=['Clause Text', 'Risk Level'])
+    texts = [preprocess_text(text) for text in df['Clause Text']]
+    labels = df['Risk Level'].to_numpy()
+    classifier = joblib.load(args.classifier)
+    onnx_dir = args.onnx_dir or os.path.join('onnx', args.model)
+    print(f"{len(texts)} clauses from {args.csv}")
+
+    reference, reference_rate = throughput(
+        SentenceTransformer(args.model, device='cpu'), texts, args.batch_size, args.repeat
+    )
+    reference_pred = classifier.predict(reference)
+    print(f"{'torch fp32':<12} {reference_rate:8.1f} sent/s  "
+          f"accuracy={np.mean(reference_pred == labels):.3f}")
+
+    agreement = None
+    for name, quantized in (('onnx fp32', False), ('onnx int8', True)):
+        encoder = OnnxEncoder(onnx_dir, quantized=quantized)
+        if encoder.quantized != quantized:
+            print(f"{name:<12} skipped, no quantized model in {onnx_dir}")
+            continue
+        embeddings, rate = throughput(encoder, texts, args.batch_size, args.repeat)
+        predicted = classifier.predict(embeddings)
+        similarity = cosine(reference, embeddings)
+        agreement = np.mean(predicted == reference_pred)
+        print(f"{name:<12} {rate:8.1f} sent/s  accuracy={np.mean(predicted == labels):.3f}  "
+              f"agreement={agreement:.3f}  cos_mean={similarity.mean():.4f}  "
+              f"cos_min={similarity.min():.4f}  speedup={rate / reference_rate:.2f}x")
+
+    if agreement is not None and agreement < args.min_agreement:
+        print(f"Label agreement {agreement:.3f} is below {args.min_agreement}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Quality-vs-speed benchmark of the summarizer tiers on a fixed PDF corpus.
+
+Each tier runs in its own subprocess so peak RSS is measured per model.
+Reports load time, summarization wall time, input tokens/sec, peak RSS
+and ROUGE-1/2/L F1 of every tier's summaries against the reference tier.
+
+Usage:
+    python bench_summarizer.py --pdfs ../data Legal-CHATBOT/LEGAL-DATA --max-docs 10
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Dict, List, Sequence
+
+from model_client import SUMMARIZER_TIERS
+
+
+def load_corpus(dirs: Sequence[str], max_docs: int, max_chars: int) -> List[Dict]:
+    """Extract text from the first max_docs PDFs, truncated to keep runs comparable"""
+    from pypdf import PdfReader
+
+    paths = sorted(
+        os.path.join(directory, name)
+        for directory in dirs if os.path.isdir(directory)
+        for name in os.listdir(directory) if name.lower().endswith('.pdf')
+    )
+    corpus = []
+    for path in paths[:max_docs]:
+        text = ' '.join(page.extract_text() or '' for page in PdfReader(path).pages)
+        text = ' '.join(text.split())[:max_chars]
+        if text:
+            corpus.append({'name': os.path.basename(path), 'text': text})
+    return corpus
+
+
+def run_tier(tier: str, corpus_path: str):
+    """Worker: summarize the corpus with one tier and print a JSON report"""
+    from model_client import load_local_summarizer
+    from summarization import LegalSummarizer
+
+    with open(corpus_path) as f:
+        corpus = json.load(f)
+
+    start = time.perf_counter()
+    summarizer = LegalSummarizer.from_env(load_local_summarizer(tier))
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    summaries = [summarizer.summarize(doc['text']) for doc in corpus]
+    wall = time.perf_counter() - start
+
+    input_tokens = sum(summarizer.token_length(doc['text']) for doc in corpus)
+    # ru_maxrss is KiB on Linux
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({
+        'tier': tier,
+        'load_seconds': load_seconds,
+        'wall_seconds': wall,
+        'input_tokens': input_tokens,
+        'tokens_per_second': input_tokens / wall if wall else 0,
+        'peak_rss_mb': peak_rss_mb,
+        'summaries': summaries
+    }))
+
+
+def ngrams(tokens: List[str], n: int) -> Counter:
+    return Counter(tuple(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+
+
+def f1(overlap: int, candidate: int, reference: int) -> float:
+    if not overlap:
+        return 0.0
+    precision, recall = overlap / candidate, overlap / reference
+    return 2 * precision * recall / (precision + recall)
+
+
+def lcs_length(a: List[str], b: List[str]) -> int:
+    previous = [0] * (len(b) + 1)
+    for x in a:
+        current = [0]
+        for j, y in enumerate(b, 1):
+            current.append(previous[j - 1] + 1 if x == y else max(previous[j], current[-1]))
+        previous = current
+    return previous[-1]
+
+
+def rouge(candidate: str, reference: str) -> Dict[str, float]:
+    """ROUGE-1/2/L F1 on lowercased whitespace tokens"""
+    cand, ref = candidate.lower().split(), reference.lower().split()
+    scores = {}
+    for n in (1, 2):
+        c, r = ngrams(cand, n), ngrams(ref, n)
+        scores[f'rouge{n}'] = f1(sum((c & r).values()), sum(c.values()), sum(r.values()))
+    scores['rougeL'] = f1(lcs_length(cand, ref), len(cand), len(ref))
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark summarizer tiers for speed, memory and ROUGE")
+    parser.add_argument("--pdfs", nargs="+", default=[os.path.join('..', 'data'),
+                                                      os.path.join('Legal-CHATBOT', 'LEGAL-DATA')])
+    parser.add_argument("--tiers", nargs="+", default=list(SUMMARIZER_TIERS))
+    parser.add_argument("--reference", default="bart-large", help="Tier the others are scored against")
+    parser.add_argument("--max-docs", type=int, default=10)
+    parser.add_argument("--max-chars", type=int, default=20000)
+    parser.add_argument("--worker", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--corpus", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_tier(args.worker, args.corpus)
+        return
+
+    corpus = load_corpus(args.pdfs, args.max_docs, args.max_chars)
+    if not corpus:
+        sys.exit(f"No PDFs with extractable text in {args.pdfs}")
+    print(f"{len(corpus)} documents, {sum(len(doc['text']) for doc in corpus)} characters")
+
+    tiers = [args.reference] + [tier for tier in args.tiers if tier != args.reference]
+    reports = {}
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+        json.dump(corpus, f)
+        corpus_path = f.name
+    try:
+        for tier in tiers:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--worker', tier, '--corpus', corpus_path],
+                capture_output=True, text=True, check=True
+            ).stdout
+            reports[tier] = json.loads(output.strip().splitlines()[-1])
+    finally:
+        os.remove(corpus_path)
+
+    reference = reports[args.reference]['summaries']
+    print(f"\n{'tier':<16} {'load s':>7} {'wall s':>8} {'tok/s':>8} {'RSS MB':>8} "
+          f"{'R-1':>6} {'R-2':>6} {'R-L':>6}")
+    for tier, report in reports.items():
+        scores = [rouge(summary, ref) for summary, ref in zip(report['summaries'], reference)]
+        mean = {key: sum(s[key] for s in scores) / len(scores) for key in ('rouge1', 'rouge2', 'rougeL')}
+        print(f"{tier:<16} {report['load_seconds']:7.1f} {report['wall_seconds']:8.1f} "
+              f"{report['tokens_per_second']:8.1f} {report['peak_rss_mb']:8.0f} "
+              f"{mean['rouge1']:6.3f} {mean['rouge2']:6.3f} {mean['rougeL']:6.3f}")
+
+
+if __name__ == "__main__":
+    main()
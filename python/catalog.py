@@ -0,0 +1,110 @@
+import json
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+
+CATALOG_FILE = 'catalog.json'
+
+
+def iter_metadata(store) -> Iterator[Tuple[int, str, Dict]]:
+    """Yield (position, id, metadata) for every indexed document, cheaply when the docstore allows"""
+    if hasattr(store.docstore, 'iter_metadata'):
+        # SQLiteDocstore can skip page content entirely
+        metadata = dict(store.docstore.iter_metadata())
+        for position, doc_id in store.index_to_docstore_id.items():
+            if doc_id in metadata:
+                yield position, doc_id, metadata[doc_id]
+        return
+    for position, doc_id in store.index_to_docstore_id.items():
+        doc = store.docstore.search(doc_id)
+        # InMemoryDocstore returns an error message for unknown ids
+        if not isinstance(doc, str):
+            yield position, doc_id, doc.metadata
+
+
+class SourceCatalog:
+    """Per-source metadata (chunk ids, counts, page ranges) for a FAISS store"""
+    def __init__(self, entries: Optional[Dict[str, Dict]] = None, ntotal: int = 0):
+        self.entries = entries or {}
+        self.ntotal = ntotal
+        self.sources: List[str] = sorted(self.entries)
+
+    @classmethod
+    def from_store(cls, store) -> 'SourceCatalog':
+        """Build the catalog by walking the docstore once"""
+        catalog = cls(ntotal=store.index.ntotal)
+        for _, doc_id, metadata in iter_metadata(store):
+            catalog.add(doc_id, metadata)
+        catalog.sources = sorted(catalog.entries)
+        return catalog
+
+    @classmethod
+    def load(cls, store_path: str) -> Optional['SourceCatalog']:
+        path = os.path.join(store_path, CATALOG_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data['sources'], data.get('ntotal', 0))
+
+    def save(self, store_path: str):
+        with open(os.path.join(store_path, CATALOG_FILE), 'w') as f:
+            json.dump({'ntotal': self.ntotal, 'sources': self.entries}, f)
+
+    def add(self, doc_id: str, metadata: Dict):
+        source = metadata.get('source')
+        if source is None:
+            return
+        entry = self.entries.setdefault(source, {
+            'chunk_ids': [],
+            'chunks': 0,
+            'pages': None,
+            'categories': []
+        })
+        entry['chunk_ids'].append(doc_id)
+        entry['chunks'] += 1
+
+        page = metadata.get('page')
+        if isinstance(page, int):
+            low, high = entry['pages'] or (page, page)
+            entry['pages'] = [min(low, page), max(high, page)]
+
+        category = metadata.get('category')
+        if category and category not in entry['categories']:
+            entry['categories'].append(category)
+
+    def stats(self, source: str) -> Optional[Dict]:
+        entry = self.entries.get(source)
+        if entry is None:
+            return None
+        return {
+            'source': source,
+            'chunks': entry['chunks'],
+            'pages': entry['pages'],
+            'categories': entry['categories']
+        }
+
+    def page(self, page: int = 1, page_size: int = 100, with_stats: bool = False) -> Dict:
+        """Return one page of source names (or their stats)"""
+        page = max(1, page)
+        page_size = max(1, page_size)
+        start = (page - 1) * page_size
+        names = self.sources[start:start + page_size]
+        return {
+            'sources': [self.stats(name) for name in names] if with_stats else names,
+            'total': len(self.sources),
+            'page': page,
+            'page_size': page_size,
+            'has_next': start + page_size < len(self.sources)
+        }
+
+
+def load_catalog(store_path: str, store) -> SourceCatalog:
+    """Load the saved catalog, rebuilding it if it is missing or out of sync with the index"""
+    catalog = SourceCatalog.load(store_path)
+    if catalog is None or catalog.ntotal != store.index.ntotal:
+        catalog = SourceCatalog.from_store(store)
+        try:
+            catalog.save(store_path)
+        except OSError as e:
+            print(f"Could not save source catalog: {e}")
+    return catalog
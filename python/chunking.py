@@ -0,0 +1,134 @@
+import re
+from typing import Iterator, List, Tuple
+
+from text_processing import CLAUSE_MARKERS
+
+# Break after sentence punctuation or right before a clause marker
+BOUNDARY_PATTERN = re.compile(rf'(?<=[.!?;:])\s+|\s+(?={CLAUSE_MARKERS})')
+
+
+def iter_segments(text: str) -> Iterator[str]:
+    """Yield sentence / clause sized segments of text without materializing a word list"""
+    start = 0
+    for match in BOUNDARY_PATTERN.finditer(text):
+        segment = text[start:match.start()].strip()
+        if segment:
+            yield segment
+        start = match.end()
+    segment = text[start:].strip()
+    if segment:
+        yield segment
+
+
+class TokenChunker:
+    """Pack text into chunks close to a model's real token budget"""
+    def __init__(self, tokenizer=None, max_tokens: int = 1024,
+                 overlap_tokens: int = 0, safety_margin: int = 8):
+        self.tokenizer = tokenizer
+        self.overlap_tokens = max(0, overlap_tokens)
+
+        special_tokens = 0
+        if tokenizer is not None and hasattr(tokenizer, 'num_special_tokens_to_add'):
+            special_tokens = tokenizer.num_special_tokens_to_add()
+        # Joined chunks are re-counted in fit(); the margin only makes that rarely have to trim
+        self.budget = max(1, max_tokens - special_tokens - safety_margin)
+
+    def count(self, text: str) -> int:
+        if self.tokenizer is None:
+            # Rough BPE estimate when no tokenizer is available
+            return int(len(text.split()) * 1.4) + 1
+        return len(self.tokenizer(text, add_special_tokens=False)['input_ids'])
+
+    def split_oversized(self, segment: str) -> Iterator[str]:
+        """Cut a single segment that exceeds the budget into budget-sized windows"""
+        if self.tokenizer is None:
+            words = segment.split()
+            step = max(1, int(self.budget / 1.4))
+            for i in range(0, len(words), step):
+                yield ' '.join(words[i:i + step])
+            return
+
+        ids = self.tokenizer(segment, add_special_tokens=False)['input_ids']
+        for i in range(0, len(ids), self.budget):
+            yield self.tokenizer.decode(ids[i:i + self.budget], skip_special_tokens=True).strip()
+
+    def overlap_tail(self, segments: List[str], counts: List[int]):
+        """Return the trailing segments that fit within the overlap budget"""
+        if not self.overlap_tokens:
+            return [], [], 0
+        tail, tail_counts, total = [], [], 0
+        for segment, n in zip(reversed(segments), reversed(counts)):
+            if total + n > self.overlap_tokens:
+                break
+            tail.insert(0, segment)
+            tail_counts.insert(0, n)
+            total += n
+        return tail, tail_counts, total
+
+    def fit(self, pieces: List[str], floor: int = 1) -> Tuple[str, int, bool]:
+        """Join pieces and re-count the result, leaving trailing pieces out until it fits.
+
+        Pieces are counted on their own, but joining them can change the
+        tokenization at the seams (a byte-level BPE folds the space into the
+        next token), so the joined text is the count that matters. At least
+        floor pieces are kept; the flag says whether the chunk fits.
+        """
+        kept = len(pieces)
+        chunk = ' '.join(pieces)
+        fits = self.count(chunk) <= self.budget
+        while not fits and kept > floor:
+            kept -= 1
+            chunk = ' '.join(pieces[:kept])
+            fits = self.count(chunk) <= self.budget
+        return chunk, kept, fits
+
+    def emit(self, current: List[str], counts: List[int], overlap: int):
+        """Cut the next chunk off current, whose first overlap pieces repeat the previous chunk.
+
+        Returns the chunk and the pieces, counts and overlap length the
+        following chunk starts with. At least one new piece is always
+        emitted, so the loop makes progress.
+        """
+        chunk, kept, fits = self.fit(current, floor=overlap + 1)
+        if not fits and overlap:
+            # The overlap leaves no room once re-counted; emit without it
+            current, counts = current[overlap:], counts[overlap:]
+            chunk, kept, _ = self.fit(current)
+        tail, tail_counts, _ = self.overlap_tail(current[:kept], counts[:kept])
+        return chunk, tail + current[kept:], tail_counts + counts[kept:], len(tail)
+
+    def chunks(self, text: str) -> Iterator[str]:
+        """Stream chunks, preferring sentence and clause boundaries"""
+        current: List[str] = []
+        counts: List[int] = []
+        current_tokens = 0
+        overlap = 0
+
+        for segment in iter_segments(text):
+            n = self.count(segment)
+            pieces = [(segment, n)]
+            if n > self.budget:
+                pieces = [(piece, self.count(piece)) for piece in self.split_oversized(segment)]
+
+            for piece, piece_tokens in pieces:
+                if len(current) > overlap and current_tokens + piece_tokens > self.budget:
+                    chunk, current, counts, overlap = self.emit(current, counts, overlap)
+                    yield chunk
+                    current_tokens = sum(counts)
+                    # Drop the overlap if it leaves no room for the next piece
+                    if overlap and current_tokens + piece_tokens > self.budget:
+                        current, counts, overlap = current[overlap:], counts[overlap:], 0
+                        current_tokens = sum(counts)
+                current.append(piece)
+                counts.append(piece_tokens)
+                current_tokens += piece_tokens
+
+        while len(current) > overlap:
+            chunk, current, counts, overlap = self.emit(current, counts, overlap)
+            yield chunk
+
+
+def chunk_text(text: str, tokenizer=None, max_tokens: int = 1024,
+               overlap_tokens: int = 0) -> List[str]:
+    """Split text into token-budgeted chunks that the model can process"""
+    return list(TokenChunker(tokenizer, max_tokens, overlap_tokens).chunks(text))
@@ -0,0 +1,100 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class CoalescingCache:
+    """In-memory TTL cache that coalesces concurrent loads and refreshes stale entries in the background.
+
+    Within ttl an entry is fresh. For stale_ttl seconds after that it is
+    still served, while one background refresh replaces it. Concurrent
+    misses for the same key wait on a single load instead of each calling
+    the loader.
+    """
+    def __init__(self, ttl: float = 300, stale_ttl: float = 900, max_entries: int = 256):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refresh_errors = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Tuple[Any, str]:
+        """Return (value, status) where status is 'fresh', 'stale', 'miss' or 'coalesced'"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, loaded_at = entry
+                age = now - loaded_at
+                if age < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value, 'fresh'
+                if age < self.ttl + self.stale_ttl:
+                    self._entries.move_to_end(key)
+                    self.stale_hits += 1
+                    if key not in self._inflight:
+                        self._inflight[key] = Future()
+                        threading.Thread(target=self._refresh, args=(key, loader), daemon=True).start()
+                    return value, 'stale'
+
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                owner = False
+            else:
+                future = self._inflight[key] = Future()
+                self.misses += 1
+                owner = True
+
+        if not owner:
+            return future.result(), 'coalesced'
+        self._load(key, loader, future)
+        return future.result(), 'miss'
+
+    def _load(self, key: Hashable, loader: Callable[[], Any], future: Future):
+        try:
+            value = loader()
+        except Exception as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            return
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._inflight.pop(key, None)
+        future.set_result(value)
+
+    def _refresh(self, key: Hashable, loader: Callable[[], Any]):
+        future = self._inflight[key]
+        self._load(key, loader, future)
+        if future.exception() is not None:
+            # Keep serving the stale entry; the next request past ttl retries
+            with self._lock:
+                self.refresh_errors += 1
+            print(f"Background refresh failed for {key}: {future.exception()}")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'inflight': len(self._inflight),
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'refresh_errors': self.refresh_errors,
+                'ttl_seconds': self.ttl,
+                'stale_ttl_seconds': self.stale_ttl
+            }
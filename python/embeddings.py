@@ -0,0 +1,217 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+# Sidecar file recording which backend built a vector store
+EMBEDDING_CONFIG_FILE = 'embedding.json'
+
+DEFAULT_MODELS = {
+    'google': 'models/embedding-001',
+    'local': 'all-MiniLM-L6-v2'
+}
+
+
+class LocalEmbeddings(Embeddings):
+    """LangChain embeddings backed by an in-process sentence-transformer; encoder must be model_name"""
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', encoder=None, batch_size: int = 64):
+        if encoder is None:
+            from model_client import get_encoder
+            encoder = get_encoder(model_name)
+        self.model_name = model_name
+        self.encoder = encoder
+        self.batch_size = batch_size
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        embeddings = self.encoder.encode(
+            list(texts),
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        )
+        return embeddings.tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper with an in-memory LRU and an optional SQLite tier"""
+    def __init__(self, underlying: Embeddings, namespace: str = '', max_entries: int = 4096,
+                 persist_path: Optional[str] = None):
+        self.underlying = underlying
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self._lru: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if persist_path:
+            self._conn = sqlite3.connect(persist_path, check_same_thread=False, isolation_level=None)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)'
+            )
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return ' '.join(str(text).casefold().split())
+
+    def key(self, text: str, kind: str) -> str:
+        # Queries and documents may be embedded differently (e.g. Google task types)
+        content = '\x1f'.join([self.namespace, kind, self.normalize(text)])
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def _lookup(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            vector = self._lru.get(key)
+            if vector is not None:
+                self._lru.move_to_end(key)
+                self.hits += 1
+                return vector
+            if self._conn is not None:
+                row = self._conn.execute('SELECT vector FROM embeddings WHERE key = ?', (key,)).fetchone()
+                if row is not None:
+                    vector = array('f', row[0]).tolist()
+                    self._remember(key, vector)
+                    self.persistent_hits += 1
+                    return vector
+            self.misses += 1
+            return None
+
+    def _remember(self, key: str, vector: List[float]):
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def _store(self, items: Dict[str, List[float]]):
+        with self._lock:
+            for key, vector in items.items():
+                self._remember(key, vector)
+            if self._conn is not None:
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)',
+                    [(key, array('f', vector).tobytes()) for key, vector in items.items()]
+                )
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed only the texts that miss the cache, in a single underlying batch"""
+        keys = [self.key(text, 'document') for text in texts]
+        vectors: List[Optional[List[float]]] = [self._lookup(key) for key in keys]
+
+        missing: Dict[str, str] = {}
+        for key, text, vector in zip(keys, texts, vectors):
+            if vector is None and key not in missing:
+                missing[key] = text
+
+        if missing:
+            computed = dict(zip(missing, self.underlying.embed_documents(list(missing.values()))))
+            self._store(computed)
+            vectors = [vector if vector is not None else computed[key] for key, vector in zip(keys, vectors)]
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self.key(text, 'query')
+        vector = self._lookup(key)
+        if vector is None:
+            vector = self.underlying.embed_query(text)
+            self._store({key: vector})
+        return vector
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.persistent_hits + self.misses
+        return {
+            'entries': len(self._lru),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'persistent_hits': self.persistent_hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits + self.persistent_hits) / max(1, lookups)
+        }
+
+
+def cached(embeddings: Embeddings, max_entries: Optional[int] = None,
+           persist_path: Optional[str] = None) -> CachedEmbeddings:
+    """Wrap an embeddings backend in a cache sized by EMBEDDING_CACHE_SIZE / EMBEDDING_CACHE_PATH"""
+    if isinstance(embeddings, CachedEmbeddings):
+        return embeddings
+    config = embedding_config_of(embeddings)
+    return CachedEmbeddings(
+        embeddings,
+        namespace=f"{config['backend']}:{config['model']}",
+        max_entries=max_entries or int(os.getenv('EMBEDDING_CACHE_SIZE', '4096')),
+        persist_path=persist_path or os.getenv('EMBEDDING_CACHE_PATH') or None
+    )
+
+
+def cache_stats(embeddings: Embeddings) -> Optional[Dict]:
+    """Return hit-rate metrics when the backend is cached"""
+    if isinstance(embeddings, CachedEmbeddings):
+        return embeddings.stats()
+    return None
+
+
+def get_embeddings(backend: Optional[str] = None, model_name: Optional[str] = None,
+                   encoder=None, use_cache: Optional[bool] = None) -> Embeddings:
+    """Build an embedding backend, defaulting to EMBEDDING_BACKEND / EMBEDDING_MODEL"""
+    backend = (backend or os.getenv('EMBEDDING_BACKEND', 'google')).lower()
+    if backend not in DEFAULT_MODELS:
+        raise ValueError(f"Unknown embedding backend: {backend}")
+    model_name = model_name or os.getenv('EMBEDDING_MODEL') or DEFAULT_MODELS[backend]
+    if use_cache is None:
+        use_cache = os.getenv('EMBEDDING_CACHE', 'on').lower() != 'off'
+
+    if backend == 'local':
+        embeddings = LocalEmbeddings(model_name, encoder=encoder)
+    else:
+        from langchain_google_genai import GoogleGenerativeAIEmbeddings
+        embeddings = GoogleGenerativeAIEmbeddings(model=model_name)
+
+    return cached(embeddings) if use_cache else embeddings
+
+
+def read_embedding_config(store_path: str) -> Dict:
+    """Return the backend a store was built with; stores without a sidecar predate it and used Google"""
+    config_path = os.path.join(store_path, EMBEDDING_CONFIG_FILE)
+    if not os.path.exists(config_path):
+        return {'backend': 'google', 'model': DEFAULT_MODELS['google']}
+    with open(config_path) as f:
+        return json.load(f)
+
+
+def write_embedding_config(store_path: str, backend: str, model_name: str, dimension: int):
+    os.makedirs(store_path, exist_ok=True)
+    with open(os.path.join(store_path, EMBEDDING_CONFIG_FILE), 'w') as f:
+        json.dump({'backend': backend, 'model': model_name, 'dimension': dimension}, f, indent=2)
+
+
+def embedding_config_of(embeddings: Embeddings) -> Dict:
+    """Describe an embeddings object in the sidecar format"""
+    if isinstance(embeddings, CachedEmbeddings):
+        embeddings = embeddings.underlying
+    if isinstance(embeddings, LocalEmbeddings):
+        return {'backend': 'local', 'model': embeddings.model_name}
+    return {'backend': 'google', 'model': getattr(embeddings, 'model', DEFAULT_MODELS['google'])}
+
+
+def embeddings_for_store(store_path: str, encoder=None, encoder_model: Optional[str] = None) -> Embeddings:
+    """Build the embedding backend that matches how a store was indexed.
+
+    An already loaded encoder is reused only when it is encoder_model and
+    the store was indexed locally with that same model; otherwise the
+    store's own model is loaded.
+    """
+    config = read_embedding_config(store_path)
+    if config['backend'] != 'local' or config['model'] != encoder_model:
+        encoder = None
+    return get_embeddings(config['backend'], config['model'], encoder=encoder)
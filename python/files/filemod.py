@@ -1,10 +1,16 @@
 import json
+import os
+import sys
 import requests
 from typing import Dict, Optional
 from datetime import datetime
 from fpdf import FPDF
 import re
 
+# Outbound calls share the pooled client in the parent python/ directory
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from http_client import get_client
+
 class OllamaLLM:
     """Handle communications with local Ollama instance"""
     def __init__(self, base_url: str = "http://localhost:11434"):
@@ -14,14 +20,17 @@ class OllamaLLM:
     def generate(self, prompt: str) -> str:
         """Send a prompt to Ollama and get the response"""
         try:
-            response = requests.post(
+            # One retry, and only if Ollama could not be reached: a POST that timed out
+            # while generating is not resent
+            response = get_client().post(
                 f"{self.base_url}/api/generate",
                 json={
                     "model": self.model,
                     "prompt": prompt,
                     "system": "You are a legal assistant helping to extract information for legal documents. Always respond in JSON format."
                 },
-                timeout=30
+                timeout=30,
+                retries=1
             )
             response.raise_for_status()
             return response.json()['response']
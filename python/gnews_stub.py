@@ -0,0 +1,104 @@
+"""Local stand-in for the GNews search API.
+
+Returns deterministic synthetic articles for each (q, country) after a
+configurable delay, and counts the calls it receives, so caching and
+request coalescing in news.py can be checked without an API key:
+
+    python gnews_stub.py
+    GNEWS_BASE_URL=http://127.0.0.1:5003/api/v4/search python news.py
+    curl http://127.0.0.1:5003/stats
+
+POST /control with {"latency_ms": ..., "fail_status": ...} changes the
+delay or makes searches fail; DELETE /stats resets the counters. The
+tests in tests/test_news_cache.py drive it this way.
+"""
+import os
+import random
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+
+from flask import Flask, jsonify, request
+
+app = Flask(__name__)
+
+ARTICLE_COUNT = int(os.getenv('STUB_ARTICLES', '60'))
+settings = {
+    'latency_ms': float(os.getenv('STUB_LATENCY_MS', '200')),
+    # When set, searches answer with this status instead of articles
+    'fail_status': None
+}
+
+calls = {'total': 0, 'by_query': {}}
+calls_lock = threading.Lock()
+
+HEADLINES = [
+    "Supreme Court ruled on {topic} appeal",
+    "District court dismissed {topic} lawsuit",
+    "High court hearing on {topic} adjourned",
+    "Attorney filed motion in {topic} case at the federal court",
+    "Local market update on {topic}",
+    "Appeals court verdict in {topic} trial",
+]
+TOPICS = ["land acquisition", "data privacy", "labour dispute", "copyright", "tax", "customs", "tenancy"]
+
+
+def synthetic_articles(query: str, country: str, count: int):
+    rng = random.Random(zlib.crc32(f"{query}|{country}".encode('utf-8')))
+    published = datetime(2025, 1, 1)
+    articles = []
+    for i in range(count):
+        topic = rng.choice(TOPICS)
+        title = rng.choice(HEADLINES).format(topic=topic)
+        articles.append({
+            'title': title,
+            'description': f"The judge heard arguments as the prosecution and defendant argued over {topic}.",
+            'url': f"https://news.example/{country}/{i}",
+            'publishedAt': (published - timedelta(hours=i)).isoformat() + 'Z',
+            'source': {'name': 'Stub News', 'url': 'https://news.example'}
+        })
+    return articles
+
+
+@app.route('/api/v4/search', methods=['GET'])
+def search():
+    query = request.args.get('q', '')
+    country = request.args.get('country', '')
+    with calls_lock:
+        calls['total'] += 1
+        calls['by_query'][f"{query}|{country}"] = calls['by_query'].get(f"{query}|{country}", 0) + 1
+
+    time.sleep(settings['latency_ms'] / 1000)
+    if settings['fail_status']:
+        return jsonify({'errors': ['Stub failure']}), settings['fail_status']
+    count = min(ARTICLE_COUNT, int(request.args.get('max', 10)))
+    articles = synthetic_articles(query, country, count)
+    return jsonify({'totalArticles': len(articles), 'articles': articles})
+
+
+@app.route('/stats', methods=['GET'])
+def stats():
+    with calls_lock:
+        return jsonify(calls)
+
+
+@app.route('/stats', methods=['DELETE'])
+def reset_stats():
+    with calls_lock:
+        calls['total'] = 0
+        calls['by_query'] = {}
+    return jsonify(calls)
+
+
+@app.route('/control', methods=['POST'])
+def control():
+    data = request.get_json() or {}
+    for key in ('latency_ms', 'fail_status'):
+        if key in data:
+            settings[key] = data[key]
+    return jsonify(settings)
+
+
+if __name__ == '__main__':
+    app.run(port=int(os.getenv('STUB_PORT', '5003')), threaded=True)
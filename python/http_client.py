@@ -0,0 +1,264 @@
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+# Upstream answers worth retrying; anything else is returned to the caller as is
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# A POST may already have run upstream on a 5xx from a proxy or a read timeout;
+# only answers saying the request was not processed are retried for it
+NON_IDEMPOTENT_RETRY_STATUSES = (429, 503)
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE', 'TRACE'})
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised without calling the upstream while its circuit is open"""
+
+
+def is_connect_error(error: Exception) -> bool:
+    """True when the connection was never established, so the request did not reach the server"""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return (isinstance(error, requests.exceptions.ConnectionError)
+            and isinstance(reason, (NewConnectionError, ConnectTimeoutError)))
+
+
+class CircuitBreaker:
+    """Open after consecutive failures, then let one trial request through after reset_timeout"""
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class HostMetrics:
+    """Counters and a latency window for one upstream host"""
+    def __init__(self):
+        self.requests = 0
+        self.attempts = 0
+        self.retries = 0
+        self.failures = 0
+        self.rejected = 0
+        self.latencies: deque = deque(maxlen=1024)
+
+    def snapshot(self) -> Dict:
+        latencies = sorted(self.latencies)
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0
+            return round(1000 * latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))], 2)
+
+        return {
+            'requests': self.requests,
+            'attempts': self.attempts,
+            'retries': self.retries,
+            'failures': self.failures,
+            'circuit_rejected': self.rejected,
+            'p50_ms': percentile(50),
+            'p99_ms': percentile(99)
+        }
+
+
+class HttpClient:
+    """Shared outbound HTTP client: keep-alive pools per host, jittered retries, timeouts, circuit breaking"""
+    def __init__(self, pool_maxsize: int = 10, retries: int = 2, backoff: float = 0.2,
+                 max_backoff: float = 2.0, timeout: Union[float, Tuple[float, float]] = (3.05, 10.0),
+                 failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        # urllib3 keeps one pool per host behind this adapter; connections are reused across calls.
+        # Its PoolManager is thread-safe, so every thread's session mounts the same adapter
+        self.adapter = HTTPAdapter(pool_connections=16, pool_maxsize=pool_maxsize, max_retries=0)
+        self._local = threading.local()
+
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._metrics: Dict[str, HostMetrics] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> 'HttpClient':
+        """Configured through HTTP_* environment variables"""
+        return cls(
+            pool_maxsize=int(os.getenv('HTTP_POOL_SIZE', '10')),
+            retries=int(os.getenv('HTTP_RETRIES', '2')),
+            backoff=float(os.getenv('HTTP_BACKOFF_SECONDS', '0.2')),
+            timeout=(float(os.getenv('HTTP_CONNECT_TIMEOUT_SECONDS', '3.05')),
+                     float(os.getenv('HTTP_READ_TIMEOUT_SECONDS', '10'))),
+            failure_threshold=int(os.getenv('HTTP_CIRCUIT_FAILURES', '5')),
+            reset_timeout=float(os.getenv('HTTP_CIRCUIT_RESET_SECONDS', '30'))
+        )
+
+    @property
+    def session(self) -> requests.Session:
+        # requests sessions (cookies, hooks) are not thread-safe; keep one per thread
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.mount('http://', self.adapter)
+            session.mount('https://', self.adapter)
+        return session
+
+    @staticmethod
+    def upstream_healthy(status_code: int) -> bool:
+        """Whether a response counts as a success for the circuit breaker, whatever was retried"""
+        return status_code < 500 and status_code != 429
+
+    def _host_state(self, host: str) -> Tuple[CircuitBreaker, HostMetrics]:
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+                self._metrics[host] = HostMetrics()
+            return self._breakers[host], self._metrics[host]
+
+    def request(self, method: str, url: str, retries: Optional[int] = None,
+                timeout: Union[None, float, Tuple[float, float]] = None, **kwargs) -> requests.Response:
+        """Send a request, retrying connection errors and RETRY_STATUSES with full-jitter backoff.
+
+        Non-idempotent methods (POST, PATCH) are only retried when the
+        connection could not be opened or on NON_IDEMPOTENT_RETRY_STATUSES,
+        never after a read timeout. Returns the last response (callers still
+        call raise_for_status) or raises the last request error; raises
+        CircuitOpenError while the host's circuit is open.
+        """
+        host = urlsplit(url).netloc
+        breaker, metrics = self._host_state(host)
+        retries = self.retries if retries is None else retries
+        timeout = self.timeout if timeout is None else timeout
+
+        with self._lock:
+            metrics.requests += 1
+        if not breaker.allow():
+            with self._lock:
+                metrics.rejected += 1
+            raise CircuitOpenError(f"Circuit open for {host}")
+
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        retry_statuses = RETRY_STATUSES if idempotent else NON_IDEMPOTENT_RETRY_STATUSES
+        response, error = None, None
+        try:
+            for attempt in range(retries + 1):
+                if attempt:
+                    time.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)))
+                start = time.perf_counter()
+                try:
+                    response, error = self.session.request(method, url, timeout=timeout, **kwargs), None
+                except requests.exceptions.RequestException as e:
+                    response, error = None, e
+                with self._lock:
+                    metrics.attempts += 1
+                    metrics.retries += 1 if attempt else 0
+                    metrics.latencies.append(time.perf_counter() - start)
+
+                if response is not None and response.status_code not in retry_statuses:
+                    break
+                if error is not None and not self.retryable(error, idempotent):
+                    break
+        finally:
+            # Always settle the breaker, so a half-open trial cannot leave the circuit stuck.
+            # Health is judged from the final answer, independently of what was retried
+            if response is not None and self.upstream_healthy(response.status_code):
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+                with self._lock:
+                    metrics.failures += 1
+
+        if response is not None:
+            return response
+        raise error
+
+    @staticmethod
+    def retryable(error: Exception, idempotent: bool) -> bool:
+        if idempotent:
+            return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+        return is_connect_error(error)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def connection_stats(self) -> Dict[str, Dict]:
+        """Connections opened vs requests served per urllib3 pool, i.e. keep-alive reuse"""
+        pools = self.adapter.poolmanager.pools
+        stats = {}
+        for key in pools.keys():
+            pool = pools[key]
+            if pool is None:
+                continue
+            stats[f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+                'connections_opened': pool.num_connections,
+                'requests': pool.num_requests,
+                'reused': max(0, pool.num_requests - pool.num_connections)
+            }
+        return stats
+
+    def stats(self) -> Dict:
+        with self._lock:
+            hosts = {
+                host: {**metrics.snapshot(), 'circuit': self._breakers[host].state}
+                for host, metrics in self._metrics.items()
+            }
+        return {'hosts': hosts, 'pools': self.connection_stats()}
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> HttpClient:
+    """Process-wide client so every caller shares the same connection pools"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient.from_env()
+        return _client
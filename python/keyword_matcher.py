@@ -0,0 +1,75 @@
+import re
+from typing import Dict, Iterable, List, NamedTuple, Set
+
+
+class KeywordMatch(NamedTuple):
+    """Terms found in a text and how many distinct terms hit each category"""
+    terms: List[str]
+    counts: Dict[str, int]
+
+
+def trie_pattern(terms: Iterable[str]) -> str:
+    """Build a regex alternation factored by common prefixes, so each position tries one branch"""
+    trie: Dict = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def render(node: Dict) -> str:
+        end = '' in node
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{body})?' if end else body
+
+    return render(trie)
+
+
+class KeywordMatcher:
+    """Compile keyword categories once and match all of them in one regex pass per text.
+
+    Terms match on word boundaries, case-insensitively, with an optional
+    plural "s"/"es". Overlapping terms are all reported, e.g. "supreme court"
+    also counts "court".
+    """
+    PLURAL = r'(?:e?s)?'
+
+    def __init__(self, keywords: Dict[str, List[str]]):
+        self.categories: Dict[str, Set[str]] = {}
+        for category, terms in keywords.items():
+            for term in terms:
+                self.categories.setdefault(term.lower(), set()).add(category)
+        self.category_names = list(keywords)
+
+        # Zero-width so matches starting inside a longer match are still found
+        self.pattern = re.compile(rf'\b(?=({trie_pattern(self.categories)}){self.PLURAL}\b)')
+        # The regex reports the longest term at a position; shorter terms it contains there
+        # (e.g. "appeal" at the start of "appeals court") are added from this table
+        self.implied: Dict[str, List[str]] = {}
+        for term in self.categories:
+            contained = [
+                other for other in self.categories
+                if other != term and re.match(rf'{re.escape(other)}{self.PLURAL}\b', term)
+            ]
+            if contained:
+                self.implied[term] = contained
+
+    def match(self, text: str) -> KeywordMatch:
+        # findall keeps the scan loop in C and returns just the captured terms
+        found: Set[str] = set(self.pattern.findall(text.lower()))
+        for term in found.intersection(self.implied):
+            found.update(self.implied[term])
+
+        counts = dict.fromkeys(self.category_names, 0)
+        for term in found:
+            for category in self.categories[term]:
+                counts[category] += 1
+        return KeywordMatch(sorted(found), counts)
+
+    def match_many(self, texts: Iterable[str]) -> List[KeywordMatch]:
+        """Batch API: one match per text, reusing the compiled pattern"""
+        match = self.match
+        return [match(text) for text in texts]
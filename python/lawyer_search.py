@@ -0,0 +1,105 @@
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class LawyerSearchEngine:
+    """Filter and rank a lawyer directory with precomputed masks and one matrix product.
+
+    Description embeddings are L2-normalized into a contiguous float32
+    matrix, so cosine similarity is a dot product. Every city,
+    specialization and language has a precomputed boolean mask; a query
+    ORs masks within a field, ANDs across fields, and only the surviving
+    rows are scored and ranked.
+    """
+    def __init__(self, df: pd.DataFrame, embeddings: np.ndarray):
+        self.df = df.reset_index(drop=True)
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        self.embeddings = np.ascontiguousarray(embeddings / np.maximum(norms, 1e-12))
+
+        # Float arrays keep missing values as NaN, which fails every minimum like the pandas filters did
+        self.rating = self.numeric(self.df['rating'])
+        self.reviews = self.numeric(self.df['reviews'])
+        self.experience = self.numeric(self.df['experience_years'])
+
+        self.masks: Dict[str, Dict[str, np.ndarray]] = {
+            'city': self.value_masks(self.df['city']),
+            'specialization': self.value_masks(self.df['specialization']),
+            # Languages are a comma-separated list per row; explode once, keep the row positions
+            'language': self.value_masks(self.df['languages'].fillna('').str.split(',').explode().str.strip())
+        }
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, encoder, batch_size: int = 64) -> 'LawyerSearchEngine':
+        embeddings = encoder.encode(
+            df['description'].fillna('').tolist(),
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        )
+        return cls(df, embeddings)
+
+    @staticmethod
+    def numeric(column: pd.Series) -> np.ndarray:
+        return pd.to_numeric(column, errors='coerce').to_numpy(dtype=np.float64)
+
+    def value_masks(self, column: pd.Series) -> Dict[str, np.ndarray]:
+        """One boolean mask per distinct value; column's index holds row positions"""
+        column = column[column.notna() & (column != '')]
+        codes, values = pd.factorize(column)
+        rows = column.index.to_numpy()
+        masks = {}
+        for code, value in enumerate(values):
+            mask = np.zeros(len(self.df), dtype=bool)
+            mask[rows[codes == code]] = True
+            masks[value] = mask
+        return masks
+
+    def values(self, field: str):
+        return sorted(self.masks[field])
+
+    def any_of(self, field: str, selected: Optional[Iterable[str]]) -> Optional[np.ndarray]:
+        selected = list(selected or [])
+        if not selected:
+            return None
+        mask = np.zeros(len(self.df), dtype=bool)
+        for value in selected:
+            if value in self.masks[field]:
+                mask |= self.masks[field][value]
+        return mask
+
+    def filter_mask(self, cities=None, specializations=None, languages=None,
+                    min_rating: float = 0, min_reviews: int = 0, min_experience: int = 0) -> np.ndarray:
+        mask = (self.rating >= min_rating) & (self.reviews >= min_reviews) & (self.experience >= min_experience)
+        for field, selected in (('city', cities), ('specialization', specializations), ('language', languages)):
+            field_mask = self.any_of(field, selected)
+            if field_mask is not None:
+                mask &= field_mask
+        return mask
+
+    def search(self, mask: np.ndarray, query_embedding: Optional[np.ndarray] = None,
+               k: Optional[int] = None, min_similarity: float = 0.1) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Return row positions (and similarities when querying), best first, for rows passing mask.
+
+        Without a query every matching row is returned in file order; k only
+        limits ranked results.
+        """
+        rows = np.flatnonzero(mask)
+        if query_embedding is None:
+            return rows, None
+
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+        query = query / max(np.linalg.norm(query), 1e-12)
+        # Scores are computed for the surviving rows only, so they stay aligned with them
+        scores = self.embeddings[rows] @ query
+        keep = scores > min_similarity
+        rows, scores = rows[keep], scores[keep]
+
+        if k is not None and k < len(rows):
+            top = np.argpartition(-scores, k - 1)[:k]
+            rows, scores = rows[top], scores[top]
+        order = np.argsort(-scores, kind='stable')
+        return rows[order], scores[order]
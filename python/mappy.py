@@ -1,8 +1,8 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+from model_client import get_encoder
+from lawyer_search import LawyerSearchEngine
 from scipy.sparse.linalg import svds
 import folium
 from streamlit_folium import folium_static
@@ -10,12 +10,13 @@ from streamlit_folium import folium_static
 # Initialize the model
 @st.cache_resource
 def load_model():
-    return SentenceTransformer('all-MiniLM-L6-v2')
+    # Shares the model server's weights when MODEL_SERVER_URL is set
+    return get_encoder('all-MiniLM-L6-v2')
 
-# Generate embeddings with fixed caching issue
-@st.cache_data
-def generate_embeddings(texts, _model):
-    return _model.encode(texts)
+# Build the search engine once per dataset: normalized float32 embeddings plus filter masks
+@st.cache_resource
+def build_search_engine(df, _model):
+    return LawyerSearchEngine.from_frame(df, _model)
 
 # Create sample Indian lawyer data
 def create_sample_data():
@@ -118,8 +119,8 @@ def main():
         # Load model
         model = load_model()
         
-        # Generate embeddings for descriptions
-        description_embeddings = generate_embeddings(df['description'].tolist(), model)
+        # Embed descriptions and precompute the filter masks
+        engine = build_search_engine(df, model)
         
         # Sidebar filters
         st.sidebar.header("Filters")
@@ -127,22 +128,19 @@ def main():
         # City filter
         cities = st.sidebar.multiselect(
             "Select Cities",
-            options=sorted(df['city'].unique())
+            options=engine.values('city')
         )
         
         # Specialization filter
         specialization = st.sidebar.multiselect(
             "Select Specialization",
-            options=sorted(df['specialization'].unique())
+            options=engine.values('specialization')
         )
         
         # Language filter
-        all_languages = set()
-        for langs in df['languages']:
-            all_languages.update([lang.strip() for lang in langs.split(',')])
         selected_languages = st.sidebar.multiselect(
             "Select Languages",
-            options=sorted(all_languages)
+            options=engine.values('language')
         )
         
         # Experience filter
@@ -154,42 +152,28 @@ def main():
         # Rating and reviews filters
         min_rating = st.sidebar.slider("Minimum Rating", 1.0, 5.0, 4.0, 0.1)
         min_reviews = st.sidebar.slider("Minimum Number of Reviews", 0, 200, 50)
+        # Only limits description searches; filtering alone lists every match
+        max_results = st.sidebar.slider("Maximum Search Results", 5, 200, 50)
         
         # Text search
         search_query = st.text_input("Search by description:")
         
-        # Filter data
-        filtered_df = df.copy()
-        
-        if cities:
-            filtered_df = filtered_df[filtered_df['city'].isin(cities)]
-        
-        if specialization:
-            filtered_df = filtered_df[filtered_df['specialization'].isin(specialization)]
-        
-        if selected_languages:
-            filtered_df = filtered_df[
-                filtered_df['languages'].apply(
-                    lambda x: any(lang.strip() in x for lang in selected_languages)
-                )
-            ]
-        
-        filtered_df = filtered_df[
-            (filtered_df['rating'] >= min_rating) &
-            (filtered_df['reviews'] >= min_reviews) &
-            (filtered_df['experience_years'] >= min_experience)
-        ]
+        # Filter data with the precomputed masks
+        mask = engine.filter_mask(
+            cities=cities,
+            specializations=specialization,
+            languages=selected_languages,
+            min_rating=min_rating,
+            min_reviews=min_reviews,
+            min_experience=min_experience
+        )
         
-        # Search using embeddings if query is provided
+        # Search using embeddings if query is provided; only rows passing the filters are scored
+        query_embedding = None
         if search_query:
-            query_embedding = model.encode([search_query])
-            similarities = cosine_similarity(query_embedding, description_embeddings)
-            similarity_scores = similarities[0]
-            
-            filtered_df['similarity'] = similarity_scores
-            filtered_df = filtered_df[filtered_df['similarity'] > 0.1]
-            filtered_df = filtered_df.sort_values('similarity', ascending=False)
-            filtered_df = filtered_df.drop('similarity', axis=1)
+            query_embedding = model.encode([search_query], convert_to_numpy=True, normalize_embeddings=True)[0]
+        rows, _ = engine.search(mask, query_embedding, k=max_results)
+        filtered_df = engine.df.iloc[rows]
         
         # Display map
         st.subheader("Lawyer Locations")
@@ -0,0 +1,186 @@
+import base64
+import os
+import threading
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import requests
+
+# When set, encoders and summarizers are served by model_server.py instead of loaded in-process
+MODEL_SERVER_URL = os.getenv('MODEL_SERVER_URL')
+
+# Summarizer quality/speed tiers: (model name, dynamic int8 quantization); see bench_summarizer.py
+SUMMARIZER_TIERS = {
+    'bart-large': ('facebook/bart-large-cnn', False),
+    'distilbart': ('sshleifer/distilbart-cnn-12-6', False),
+    'distilbart-int8': ('sshleifer/distilbart-cnn-12-6', True)
+}
+DEFAULT_SUMMARIZER_TIER = 'bart-large'
+
+
+def pack_array(array: np.ndarray) -> Dict:
+    """Encode a float32 matrix for JSON transport without per-float formatting"""
+    array = np.ascontiguousarray(array, dtype=np.float32)
+    return {'shape': list(array.shape), 'data': base64.b64encode(array.tobytes()).decode('ascii')}
+
+
+def unpack_array(payload: Dict) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(payload['data']), dtype=np.float32).reshape(payload['shape'])
+
+
+class ModelServerClient:
+    """Thin HTTP client for model_server.py with a pooled keep-alive session"""
+    def __init__(self, url: str, timeout: float = 120.0):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self._local = threading.local()
+
+    @property
+    def session(self) -> requests.Session:
+        # requests sessions are not thread-safe; keep one per thread
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def post(self, path: str, payload: Dict) -> Dict:
+        response = self.session.post(f"{self.url}{path}", json=payload, timeout=self.timeout)
+        if response.status_code != 200:
+            raise RuntimeError(f"Model server {path} failed ({response.status_code}): {response.text[:200]}")
+        return response.json()
+
+
+class RemoteEncoder:
+    """Drop-in for SentenceTransformer.encode backed by the shared model server"""
+    def __init__(self, client: ModelServerClient, model_name: str):
+        self.client = client
+        self.model_name = model_name
+        # Reported by the server with every /encode response
+        self._backend: Optional[str] = None
+        self._quantized: Optional[bool] = None
+
+    def describe(self):
+        if self._backend is None:
+            # Nothing encoded yet; a one-text probe loads the server's encoder and reports it
+            self.encode(['backend probe'])
+
+    @property
+    def backend(self) -> str:
+        self.describe()
+        return self._backend
+
+    @property
+    def quantized(self) -> bool:
+        self.describe()
+        return self._quantized
+
+    def encode(self, sentences: Union[str, Sequence[str]], batch_size: Optional[int] = None,
+               convert_to_numpy: bool = True, normalize_embeddings: bool = False,
+               show_progress_bar: bool = False, **kwargs) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        result = self.client.post('/encode', {
+            'model': self.model_name,
+            'texts': texts,
+            'normalize': normalize_embeddings
+        })
+        self._backend = result.get('backend', 'torch')
+        self._quantized = bool(result.get('quantized', False))
+        embeddings = unpack_array(result['embeddings'])
+        return embeddings[0] if single else embeddings
+
+
+def resolve_summarizer_tier(tier: str) -> Tuple[str, bool]:
+    """Map a tier name (or a plain model name) to (model name, quantized)"""
+    if tier.endswith('-int8') and tier not in SUMMARIZER_TIERS:
+        return tier[:-len('-int8')], True
+    return SUMMARIZER_TIERS.get(tier, (tier, False))
+
+
+class RemoteSummarizer:
+    """Callable with the summarization-pipeline interface LegalSummarizer relies on"""
+    def __init__(self, client: ModelServerClient, tier: str):
+        model_name, quantized = resolve_summarizer_tier(tier)
+        self.client = client
+        self.tier = tier
+        self.quantized = quantized
+        self.model = SimpleNamespace(name_or_path=model_name)
+        self._tokenizer = None
+
+    @property
+    def tokenizer(self):
+        # Only the tokenizer is loaded locally, for token-budget chunking
+        if self._tokenizer is None:
+            from transformers import AutoTokenizer
+            self._tokenizer = AutoTokenizer.from_pretrained(self.model.name_or_path)
+        return self._tokenizer
+
+    def __call__(self, texts: Union[str, Sequence[str]], max_length: int = 150,
+                 min_length: int = 30, **kwargs) -> List[Dict]:
+        texts = [texts] if isinstance(texts, str) else list(texts)
+        result = self.client.post('/summarize', {
+            'model': self.tier,
+            'texts': texts,
+            'max_length': max_length,
+            'min_length': min_length
+        })
+        return [{'summary_text': summary} for summary in result['summaries']]
+
+
+def encoder_variant(encoder) -> str:
+    """Backend and precision of a local or remote encoder, e.g. 'torch' or 'onnx-int8'"""
+    backend = getattr(encoder, 'backend', None) or 'torch'
+    return f"{backend}-int8" if getattr(encoder, 'quantized', False) else backend
+
+
+def load_local_encoder(model_name: str = 'all-MiniLM-L6-v2', backend: str = 'torch'):
+    """Load an in-process encoder: PyTorch sentence-transformer, or the exported ONNX graph"""
+    if backend == 'onnx':
+        from onnx_encoder import OnnxEncoder
+        return OnnxEncoder.from_env(model_name)
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+
+def get_encoder(model_name: str = 'all-MiniLM-L6-v2', backend: str = 'torch'):
+    """Return a remote encoder when MODEL_SERVER_URL is set, else load one in-process"""
+    if MODEL_SERVER_URL:
+        return RemoteEncoder(ModelServerClient(MODEL_SERVER_URL), model_name)
+    return load_local_encoder(model_name, backend)
+
+
+def load_local_summarizer(tier: str = DEFAULT_SUMMARIZER_TIER):
+    """Load a summarization pipeline for a tier, quantizing its linear layers to int8 if asked"""
+    import torch
+    from transformers import pipeline
+
+    model_name, quantized = resolve_summarizer_tier(tier)
+    if quantized:
+        # Dynamic int8 quantization is a CPU-only path
+        summarizer = pipeline("summarization", model=model_name, device=-1)
+        summarizer.model = torch.quantization.quantize_dynamic(
+            summarizer.model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+    else:
+        summarizer = pipeline(
+            "summarization",
+            model=model_name,
+            device=0 if torch.cuda.is_available() else -1
+        )
+    # Distinguishes quantized output in LegalSummarizer.version
+    summarizer.quantized = quantized
+    return summarizer
+
+
+def get_summarizer(tier: Optional[str] = None):
+    """Return a remote summarizer when MODEL_SERVER_URL is set, else a local pipeline.
+
+    tier is a SUMMARIZER_TIERS key or a model name, defaulting to SUMMARIZER_TIER.
+    """
+    tier = tier or os.getenv('SUMMARIZER_TIER', DEFAULT_SUMMARIZER_TIER)
+    if MODEL_SERVER_URL:
+        return RemoteSummarizer(ModelServerClient(MODEL_SERVER_URL), tier)
+    return load_local_summarizer(tier)
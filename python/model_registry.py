@@ -0,0 +1,96 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+class ModelDisabledError(RuntimeError):
+    """Raised when a model switched off through MODELS_DISABLED is requested"""
+
+
+class ModelRegistry:
+    """Loads models lazily on first use and reports per-model readiness"""
+    def __init__(self, disabled: Optional[Iterable[str]] = None):
+        self.disabled = set(disabled or [])
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._optional: Dict[str, bool] = {}
+        self._models: Dict[str, Any] = {}
+        self._status: Dict[str, Dict] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+
+    @classmethod
+    def from_env(cls) -> 'ModelRegistry':
+        """MODELS_DISABLED is a comma-separated list of optional models to skip"""
+        disabled = os.getenv('MODELS_DISABLED', '')
+        return cls(name.strip() for name in disabled.split(',') if name.strip())
+
+    def register(self, name: str, loader: Callable[[], Any], optional: bool = False):
+        if name in self.disabled and not optional:
+            raise ValueError(f"Model '{name}' is required and cannot be disabled")
+        self._loaders[name] = loader
+        self._optional[name] = optional
+        self._locks[name] = threading.Lock()
+        self._status[name] = {'state': 'disabled' if name in self.disabled else 'not_loaded'}
+
+    def enabled(self, name: str) -> bool:
+        return name in self._loaders and name not in self.disabled
+
+    def loaded(self, name: str) -> bool:
+        return name in self._models
+
+    def get(self, name: str) -> Any:
+        """Return the model, loading it on the calling thread if needed"""
+        if name in self._models:
+            return self._models[name]
+        if name not in self._loaders:
+            raise KeyError(f"Unknown model '{name}'")
+        if name in self.disabled:
+            raise ModelDisabledError(f"Model '{name}' is disabled")
+
+        # One loader per model; concurrent callers wait for it instead of loading twice
+        with self._locks[name]:
+            if name in self._models:
+                return self._models[name]
+            self._status[name] = {'state': 'loading'}
+            start = time.perf_counter()
+            try:
+                model = self._loaders[name]()
+            except Exception as e:
+                self._status[name] = {'state': 'failed', 'error': str(e)}
+                raise
+            self._models[name] = model
+            self._status[name] = {
+                'state': 'ready',
+                'load_seconds': round(time.perf_counter() - start, 3)
+            }
+            return model
+
+    def warm_up(self, names: Optional[Iterable[str]] = None, background: bool = True):
+        """Load the given (default: all enabled) models, optionally on a daemon thread"""
+        names = [name for name in (names or self._loaders) if self.enabled(name)]
+
+        def load_all():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    print(f"Warm-up of model '{name}' failed: {e}")
+
+        if not background:
+            load_all()
+            return None
+        thread = threading.Thread(target=load_all, name='model-warmup', daemon=True)
+        thread.start()
+        return thread
+
+    def status(self) -> Dict:
+        """Readiness of every model; ready once all enabled required models are loaded"""
+        models = {
+            name: {**status, 'optional': self._optional[name]}
+            for name, status in self._status.items()
+        }
+        ready = all(
+            self.loaded(name) for name in self._loaders
+            if self.enabled(name) and not self._optional[name]
+        )
+        return {'ready': ready, 'models': models}
@@ -0,0 +1,161 @@
+"""Shared inference server for the sentence-transformer and BART summarizer.
+
+Services set MODEL_SERVER_URL (e.g. http://127.0.0.1:5010) and get thin
+clients from model_client.py instead of loading the weights themselves.
+Concurrent requests are coalesced into shared forward passes by a
+MicroBatcher per model and generation setting.
+
+Usage:
+    python model_server.py
+"""
+import os
+import threading
+from typing import Dict, List
+
+from flask import Flask, jsonify, request
+
+from batching import MicroBatcher
+from model_client import (DEFAULT_SUMMARIZER_TIER, encoder_variant, load_local_encoder,
+                          load_local_summarizer, pack_array, resolve_summarizer_tier)
+from model_registry import ModelRegistry
+
+ENCODER_MODEL = os.getenv('ENCODER_MODEL', 'all-MiniLM-L6-v2')
+SUMMARIZER_TIER = os.getenv('SUMMARIZER_TIER', DEFAULT_SUMMARIZER_TIER)
+MAX_WAIT_MS = float(os.getenv('MODEL_SERVER_MAX_WAIT_MS', '5'))
+ENCODE_BATCH_SIZE = int(os.getenv('MODEL_SERVER_ENCODE_BATCH', '128'))
+SUMMARIZE_BATCH_SIZE = int(os.getenv('MODEL_SERVER_SUMMARIZE_BATCH', '8'))
+
+app = Flask(__name__)
+
+
+def load_encoder():
+    # ENCODER_BACKEND=onnx serves the exported (int8) graph from onnx_encoder.py
+    return load_local_encoder(ENCODER_MODEL, os.getenv('ENCODER_BACKEND', 'torch'))
+
+
+def load_summarizer():
+    return load_local_summarizer(SUMMARIZER_TIER)
+
+
+# MODELS_DISABLED=summarizer runs an encoder-only server, and vice versa
+models = ModelRegistry.from_env()
+models.register('encoder', load_encoder, optional=True)
+models.register('summarizer', load_summarizer, optional=True)
+
+batchers: Dict[str, MicroBatcher] = {}
+batchers_lock = threading.Lock()
+
+
+def get_batcher(name: str, fn, max_batch_size: int) -> MicroBatcher:
+    """One batcher per model and generation setting, since a batch shares its parameters"""
+    with batchers_lock:
+        if name not in batchers:
+            batchers[name] = MicroBatcher(fn, max_batch_size=max_batch_size, max_wait_ms=MAX_WAIT_MS, name=name)
+        return batchers[name]
+
+
+def encode_batch(texts: List[str], normalize: bool):
+    return models.get('encoder').encode(
+        texts,
+        batch_size=ENCODE_BATCH_SIZE,
+        convert_to_numpy=True,
+        normalize_embeddings=normalize,
+        show_progress_bar=False
+    )
+
+
+def summarize_batch(texts: List[str], max_length: int, min_length: int) -> List[str]:
+    outputs = models.get('summarizer')(
+        texts,
+        batch_size=SUMMARIZE_BATCH_SIZE,
+        max_length=max_length,
+        min_length=min_length,
+        do_sample=False,
+        truncation=True
+    )
+    return [(output[0] if isinstance(output, list) else output)['summary_text'] for output in outputs]
+
+
+def check_model(data: Dict, served: str, resolve=lambda name: name):
+    requested = data.get('model')
+    if requested and resolve(requested) != resolve(served):
+        return jsonify({'error': f"Server runs {served}, not {requested}"}), 400
+    return None
+
+
+@app.route('/encode', methods=['POST'])
+def encode():
+    data = request.json or {}
+    texts = data.get('texts')
+    if not isinstance(texts, list):
+        return jsonify({'error': 'texts must be a list'}), 400
+    mismatch = check_model(data, ENCODER_MODEL)
+    if mismatch:
+        return mismatch
+    if not models.enabled('encoder'):
+        return jsonify({'error': 'encoder is disabled'}), 503
+
+    normalize = bool(data.get('normalize', False))
+    batcher = get_batcher(
+        f"encode-{'norm' if normalize else 'raw'}",
+        lambda batch: encode_batch(batch, normalize),
+        ENCODE_BATCH_SIZE
+    )
+    try:
+        embeddings = batcher.submit(texts)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    encoder = models.get('encoder')
+    return jsonify({
+        'model': ENCODER_MODEL,
+        # Lets clients tell int8 vectors apart, e.g. to avoid querying fp32-built indexes with them
+        'backend': getattr(encoder, 'backend', None) or 'torch',
+        'quantized': bool(getattr(encoder, 'quantized', False)),
+        'embeddings': pack_array(embeddings)
+    })
+
+
+@app.route('/summarize', methods=['POST'])
+def summarize():
+    data = request.json or {}
+    texts = data.get('texts')
+    if not isinstance(texts, list):
+        return jsonify({'error': 'texts must be a list'}), 400
+    mismatch = check_model(data, SUMMARIZER_TIER, resolve_summarizer_tier)
+    if mismatch:
+        return mismatch
+    if not models.enabled('summarizer'):
+        return jsonify({'error': 'summarizer is disabled'}), 503
+
+    max_length = int(data.get('max_length', 150))
+    min_length = int(data.get('min_length', 30))
+    batcher = get_batcher(
+        f"summarize-{max_length}-{min_length}",
+        lambda batch: summarize_batch(batch, max_length, min_length),
+        SUMMARIZE_BATCH_SIZE
+    )
+    try:
+        summaries = batcher.submit(texts)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    return jsonify({'model': SUMMARIZER_TIER, 'summaries': summaries})
+
+
+@app.route('/health', methods=['GET'])
+def health():
+    status = models.status()
+    return jsonify({
+        **status,
+        'encoder_model': ENCODER_MODEL,
+        'encoder_variant': encoder_variant(models.get('encoder')) if models.loaded('encoder') else None,
+        'summarizer_tier': SUMMARIZER_TIER,
+        'batchers': {name: batcher.stats() for name, batcher in batchers.items()}
+    }), 200 if status['ready'] else 503
+
+
+if __name__ == '__main__':
+    if os.getenv('MODELS_WARMUP', 'true').lower() != 'false':
+        models.warm_up()
+    # Threaded so concurrent requests can meet in the same batch
+    app.run(host=os.getenv('MODEL_SERVER_HOST', '127.0.0.1'),
+            port=int(os.getenv('MODEL_SERVER_PORT', '5010')), threaded=True)
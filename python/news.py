@@ -1,47 +1,176 @@
 from flask import Flask, jsonify, request
 from flask_cors import CORS
-import requests
 from datetime import datetime
 import re
+import ipaddress
 import maxminddb
 import geoip2.database
+import geoip2.errors
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from keyword_matcher import KeywordMatch, KeywordMatcher
+from coalescing_cache import CoalescingCache
+from http_client import get_client
 
 app = Flask(__name__)
 CORS(app)
 
+DEFAULT_LOCATION = {
+    'city': None,
+    'state': None,
+    'country': 'IN',
+    'latitude': None,
+    'longitude': None
+}
+
 class LocationDetector:
-    def _init_(self):
+    def __init__(self, db_path=None, cache_size=4096, api_timeout=2.0, api_queue_size=None,
+                 failure_ttl=None):
         """Initialize with GeoLite2 database"""
         try:
-            self.reader = geoip2.database.Reader('GeoLite2-City.mmdb')
+            # Memory-mapped, so lookups are in-process and pages are shared between workers
+            self.reader = geoip2.database.Reader(
+                db_path or os.getenv('GEOIP_DB_PATH', 'GeoLite2-City.mmdb'),
+                mode=maxminddb.MODE_MMAP
+            )
         except Exception as e:
             print(f"Error loading GeoIP database: {e}")
             self.reader = None
 
-    def get_location_from_ip(self, ip_address):
-        """Get location details from IP address"""
+        self.cache_size = cache_size
+        self.api_timeout = api_timeout
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        # Network fallback runs off the request path; results land in the cache.
+        # The executor's queue is unbounded, so _pending caps what is queued or running
+        self._api_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='geoip-api')
+        self._pending = set()
+        self.api_queue_size = api_queue_size or int(os.getenv('GEOIP_API_QUEUE_SIZE', '64'))
+        self.api_dropped = 0
+        # Failed or rate-limited lookups are not retried until their entry expires
+        self.failure_ttl = failure_ttl if failure_ttl is not None else float(
+            os.getenv('GEOIP_API_FAILURE_TTL_SECONDS', '300'))
+        self._failures = OrderedDict()
+
+    def _cached(self, ip_address):
+        with self._lock:
+            location = self._cache.get(ip_address)
+            if location is not None:
+                self._cache.move_to_end(ip_address)
+            return location
+
+    def _store(self, ip_address, location):
+        with self._lock:
+            self._cache[ip_address] = location
+            self._cache.move_to_end(ip_address)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def lookup_database(self, ip_address):
+        """Resolve from the mmdb only; None when the address is unknown or invalid"""
+        if self.reader is None:
+            return None
         try:
-            if self.reader is None:
-                return self.get_location_from_api(ip_address)
-            
             response = self.reader.city(ip_address)
-            return {
-                'city': response.city.name,
-                'state': response.subdivisions.most_specific.name if response.subdivisions else None,
-                'country': response.country.iso_code or 'IN',
-                'latitude': response.location.latitude,
-                'longitude': response.location.longitude
-            }
+        except (ValueError, geoip2.errors.AddressNotFoundError):
+            return None
         except Exception as e:
-            print(f"Error getting location from database: {e}")
-            return self.get_location_from_api(ip_address)
+            # A corrupt or truncated mmdb must not fail the request; callers fall back to defaults
+            print(f"Error reading GeoIP database for {ip_address}: {e}")
+            return None
+        return {
+            'city': response.city.name,
+            'state': response.subdivisions.most_specific.name if response.subdivisions else None,
+            'country': response.country.iso_code or 'IN',
+            'latitude': response.location.latitude,
+            'longitude': response.location.longitude
+        }
+
+    def get_location_from_ip(self, ip_address):
+        """Get location details from IP address"""
+        return self.resolve_many([ip_address])[ip_address]
+
+    def resolve_many(self, ip_addresses):
+        """Batch-resolve addresses from the cache and mmdb, scheduling API lookups for the rest"""
+        results = {}
+        for ip_address in set(ip_addresses):
+            location = self._cached(ip_address)
+            if location is None:
+                location = self.lookup_database(ip_address)
+                if location is not None:
+                    self._store(ip_address, location)
+                elif not self.is_public(ip_address):
+                    # Nothing to look up for private or malformed addresses
+                    location = DEFAULT_LOCATION
+                    self._store(ip_address, location)
+                else:
+                    self.schedule_api_lookup(ip_address)
+                    location = DEFAULT_LOCATION
+            # Callers may modify the dict they get back
+            results[ip_address] = dict(location)
+        return results
+
+    @staticmethod
+    def is_public(ip_address):
+        try:
+            return ipaddress.ip_address(ip_address).is_global
+        except ValueError:
+            return False
+
+    def _failed_recently(self, ip_address):
+        failed_at = self._failures.get(ip_address)
+        if failed_at is None:
+            return False
+        if time.monotonic() - failed_at < self.failure_ttl:
+            return True
+        del self._failures[ip_address]
+        return False
+
+    def _record_failure(self, ip_address):
+        with self._lock:
+            self._failures[ip_address] = time.monotonic()
+            self._failures.move_to_end(ip_address)
+            while len(self._failures) > self.cache_size:
+                self._failures.popitem(last=False)
+
+    def schedule_api_lookup(self, ip_address):
+        """Queue an API lookup unless one is pending, it failed recently or the queue is full"""
+        with self._lock:
+            if ip_address in self._pending or self._failed_recently(ip_address):
+                return
+            if len(self._pending) >= self.api_queue_size:
+                # Callers already got the default location; drop rather than queue without bound
+                self.api_dropped += 1
+                return
+            self._pending.add(ip_address)
+
+        def lookup():
+            try:
+                location = self.get_location_from_api(ip_address)
+                if location is not None:
+                    self._store(ip_address, location)
+                else:
+                    self._record_failure(ip_address)
+            finally:
+                with self._lock:
+                    self._pending.discard(ip_address)
+
+        self._api_pool.submit(lookup)
 
     def get_location_from_api(self, ip_address):
         """Fallback method using external IP API"""
         try:
-            response = requests.get(f'https://ipapi.co/{ip_address}/json/')
+            # Already off the request path, so a single attempt is enough
+            response = get_client().get(f'https://ipapi.co/{ip_address}/json/',
+                                        timeout=self.api_timeout, retries=0)
             data = response.json()
+            if data.get('error'):
+                # Rate limited or reserved address; only negatively cached, for failure_ttl
+                print(f"IP API error for {ip_address}: {data.get('reason')}")
+                return None
             return {
                 'city': data.get('city'),
                 'state': data.get('region'),
@@ -51,19 +180,20 @@ class LocationDetector:
             }
         except Exception as e:
             print(f"Error getting location from API: {e}")
-            return {
-                'city': None,
-                'state': None,
-                'country': 'IN',
-                'latitude': None,
-                'longitude': None
-            }
+            return None
 
 class LegalNewsFetcher:
     def __init__(self, api_key):
         """Initialize the Legal News Fetcher with API key and configuration"""
         self.api_key = api_key
-        self.base_url = "https://gnews.io/api/v4/search"
+        # GNEWS_BASE_URL points at gnews_stub.py for local runs
+        self.base_url = os.getenv('GNEWS_BASE_URL', "https://gnews.io/api/v4/search")
+        # Fetch the API maximum once and serve every page of it from the cache
+        self.max_articles = int(os.getenv('GNEWS_MAX_ARTICLES', '100'))
+        self.cache = CoalescingCache(
+            ttl=float(os.getenv('NEWS_CACHE_TTL_SECONDS', '300')),
+            stale_ttl=float(os.getenv('NEWS_CACHE_STALE_SECONDS', '900'))
+        )
         self.location_detector = LocationDetector()
         
         # Core legal terms for search
@@ -97,6 +227,8 @@ class LegalNewsFetcher:
                 'courthouse', 'department of justice', 'doj'
             ]
         }
+        # All categories compiled into one word-boundary pattern
+        self.keyword_matcher = KeywordMatcher(self.legal_keywords)
 
     def get_user_location(self, request):
         """Get user's location from their IP address with guaranteed defaults"""
@@ -108,13 +240,7 @@ class LegalNewsFetcher:
         
         # Ensure we always return a valid location dictionary with defaults
         if not location or not isinstance(location, dict):
-            location = {
-                'city': None,
-                'state': None,
-                'country': 'IN',
-                'latitude': None,
-                'longitude': None
-            }
+            location = dict(DEFAULT_LOCATION)
         
         # Ensure country is never None
         if not location.get('country'):
@@ -122,14 +248,13 @@ class LegalNewsFetcher:
             
         return location
 
-    def is_legal_article(self, article):
-        """Determine if an article is legal news"""
-        text = f"{article.get('title', '')} {article.get('description', '')}".lower()
-        
-        matches = {
-            category: sum(1 for term in terms if term.lower() in text)
-            for category, terms in self.legal_keywords.items()
-        }
+    @staticmethod
+    def article_text(article):
+        return f"{article.get('title') or ''} {article.get('description') or ''}"
+
+    def is_legal_match(self, match: KeywordMatch):
+        """Apply the legal-news rule to an article's keyword matches"""
+        matches = match.counts
         
         has_institution = matches['institutions'] > 0
         has_action_or_term = matches['actions'] > 0 or matches['legal_terms'] > 0
@@ -137,6 +262,18 @@ class LegalNewsFetcher:
         
         return has_institution and has_action_or_term and total_matches >= 3
 
+    def is_legal_article(self, article):
+        """Determine if an article is legal news"""
+        return self.is_legal_match(self.keyword_matcher.match(self.article_text(article)))
+
+    def classify_articles(self, articles):
+        """Batch API: return (article, match) pairs for the legal articles, in order"""
+        matches = self.keyword_matcher.match_many(self.article_text(article) for article in articles)
+        return [
+            (article, match) for article, match in zip(articles, matches)
+            if self.is_legal_match(match)
+        ]
+
     def generate_search_query(self, location):
         """Generate search query based on location with null checking"""
         query_parts = []
@@ -151,45 +288,42 @@ class LegalNewsFetcher:
         
         return ' AND '.join(query_parts) if len(query_parts) > 1 else legal_query
 
+    def fetch_legal_articles(self, search_query, country_code):
+        """Call GNews once and keep the legal articles with their matched terms"""
+        params = {
+            'q': search_query,
+            'lang': 'en',
+            'country': country_code,
+            'max': self.max_articles,
+            'apikey': self.api_key
+        }
+        
+        response = get_client().get(self.base_url, params=params)
+        response.raise_for_status()
+        data = response.json()
+        
+        # One matcher pass per article classifies it and records its terms
+        return self.classify_articles(data.get('articles', []))
+
     def fetch_news(self, request, page=1, page_size=10):
         """Fetch legal news based on user's location"""
         try:
             location = self.get_user_location(request)
             search_query = self.generate_search_query(location)
             
-            buffer_size = min(page_size * 3, 100)
-            
             # Ensure country code is always a valid string
             country_code = (location.get('country') or 'IN').lower()
             
-            params = {
-                'q': search_query,
-                'lang': 'en',
-                'country': country_code,
-                'max': buffer_size,
-                'apikey': self.api_key
-            }
-            
-            response = requests.get(self.base_url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            legal_articles = [
-                article for article in data.get('articles', [])
-                if self.is_legal_article(article)
-            ]
+            # Pages of the same query share one cached (and coalesced) upstream call
+            legal_articles, cache_status = self.cache.get(
+                (search_query, country_code),
+                lambda: self.fetch_legal_articles(search_query, country_code)
+            )
             
             start_idx = (page - 1) * page_size
             end_idx = start_idx + page_size
             paged_articles = legal_articles[start_idx:end_idx]
             
-            def get_matched_terms(article_text):
-                article_text = article_text.lower()
-                matches = []
-                for category, terms in self.legal_keywords.items():
-                    matches.extend([term for term in terms if term.lower() in article_text])
-                return list(set(matches))
-            
             return {
                 'success': True,
                 'data': {
@@ -205,11 +339,9 @@ class LegalNewsFetcher:
                             'url': article.get('url'),
                             'publishedAt': article.get('publishedAt'),
                             'location': location,
-                            'legal_terms_found': get_matched_terms(
-                                f"{article.get('title', '')} {article.get('description', '')}"
-                            )
+                            'legal_terms_found': match.terms
                         }
-                        for idx, article in enumerate(paged_articles)
+                        for idx, (article, match) in enumerate(paged_articles)
                     ],
                     'meta': {
                         'pagination': {
@@ -221,7 +353,8 @@ class LegalNewsFetcher:
                             'has_previous': page > 1
                         },
                         'location': location,
-                        'detected_from': 'ip_address'
+                        'detected_from': 'ip_address',
+                        'cache': cache_status
                     }
                 }
             }
@@ -268,5 +401,15 @@ def get_news():
             }
         }), 500
 
+@app.route('/api/http/stats', methods=['GET'])
+def http_stats():
+    """Report upstream latency, retries, circuit state and connection reuse"""
+    return jsonify(get_client().stats())
+
+@app.route('/api/news/cache', methods=['GET'])
+def news_cache_stats():
+    """Report GNews cache hit, stale and coalescing counters"""
+    return jsonify(news_fetcher.cache.stats())
+
 if __name__ == '__main__':
     app.run(debug=True,port=5002)
\ No newline at end of file
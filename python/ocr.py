@@ -1,77 +1,26 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-from transformers import pipeline
-import torch
+from model_client import get_summarizer
+from summarization import LegalSummarizer
+from result_cache import ResultCache
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
 # Initialize the summarization pipeline with BART
-# Using facebook/bart-large-cnn model which is good for summarization
-# You can also try 'sshleifer/distilbart-cnn-12-6' for a lighter model
-summarizer = pipeline(
-    "summarization",
-    model="facebook/bart-large-cnn",
-    device=0 if torch.cuda.is_available() else -1  # Use GPU if available
-)
+# SUMMARIZER_TIER selects facebook/bart-large-cnn (default), distilbart-cnn-12-6 for a
+# lighter model, or distilbart-int8; compare them with bench_summarizer.py
+# With MODEL_SERVER_URL set, the weights live in model_server.py and are shared with vectorize.py
+summarizer = get_summarizer()
+legal_summarizer = LegalSummarizer.from_env(summarizer)
 
-def chunk_text(text, max_chunk_size=1024):
-    """
-    Split text into chunks that the model can process
-    """
-    words = text.split()
-    chunks = []
-    current_chunk = []
-    current_size = 0
-    
-    for word in words:
-        if current_size + len(word) + 1 <= max_chunk_size:
-            current_chunk.append(word)
-            current_size += len(word) + 1
-        else:
-            chunks.append(' '.join(current_chunk))
-            current_chunk = [word]
-            current_size = len(word) + 1
-            
-    if current_chunk:
-        chunks.append(' '.join(current_chunk))
-        
-    return chunks
+# Summaries are shared with /api/analyze when both services point at the same cache file
+result_cache = ResultCache.from_env(versions={'summary': legal_summarizer.version})
 
 def summarize_legal_document(text):
-    """
-    Summarize legal document text using BART model
-    """
+    """Summarize legal document text using BART model"""
     try:
-        # Split text into chunks if it's too long
-        chunks = chunk_text(text)
-        
-        # Summarize each chunk
-        summaries = []
-        for chunk in chunks:
-            # Skip empty or very short chunks
-            if len(chunk.split()) < 10:
-                continue
-                
-            summary = summarizer(chunk, 
-                               max_length=150,
-                               min_length=30,
-                               do_sample=False)
-            summaries.append(summary[0]['summary_text'])
-        
-        # Combine summaries
-        final_summary = ' '.join(summaries)
-        
-        # If the text was very short and didn't need chunking
-        if not final_summary and text:
-            summary = summarizer(text,
-                               max_length=150,
-                               min_length=30,
-                               do_sample=False)
-            final_summary = summary[0]['summary_text']
-            
-        return final_summary
-
+        return legal_summarizer.summarize(text)
     except Exception as e:
         print(f"Error in summarization: {str(e)}")
         return None
@@ -92,7 +41,9 @@ def summarize():
         cleaned_text = ' '.join(ocr_text.split())
 
         # Generate summary
-        summary = summarize_legal_document(cleaned_text)
+        summary = result_cache.get_or_compute(
+            cleaned_text, 'summary', lambda: summarize_legal_document(cleaned_text)
+        )
         
         if summary is None:
             return jsonify({
@@ -110,5 +61,10 @@ def summarize():
             'error': str(e)
         }), 500
 
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Report result cache size and hit/miss counters"""
+    return jsonify(result_cache.stats())
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -1,10 +1,17 @@
 from flask import Flask, request, jsonify
 import os
-from langchain_community.vectorstores import FAISS
-from langchain_google_genai import GoogleGenerativeAI, GoogleGenerativeAIEmbeddings
+import sys
+from langchain_google_genai import GoogleGenerativeAI
 from dotenv import load_dotenv
 from flask_cors import CORS
 
+# Shared retrieval helpers live in the parent python/ directory
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from vector_store import load_vector_store
+from catalog import load_catalog
+from retrieval import FilteredSearcher
+from embeddings import cache_stats
+
 def create_app():
     app = Flask(__name__)
     CORS(app)
@@ -21,7 +28,8 @@ def create_app():
         """Health check endpoint"""
         return jsonify({
             'status': 'healthy',
-            'message': 'Law comparison system is running'
+            'message': 'Law comparison system is running',
+            'embedding_cache': cache_stats(app.comparator.embeddings) if app.comparator else None
         })
 
     @app.route('/compare', methods=['POST'])
@@ -71,7 +79,9 @@ def create_app():
             query = data['query']
             k = data.get('k', 2)  # Optional parameter for number of results
             
-            results = app.comparator.search_law(query, k=k)
+            sources = data.get('sources')  # Optional list of source files to search within
+            
+            results = app.comparator.search_law(query, k=k, sources=sources)
             
             return jsonify({
                 'results': results
@@ -91,16 +101,32 @@ def create_app():
                     'error': 'System not properly initialized'
                 }), 500
             
-            sources = app.comparator.list_available_sources()
-            return jsonify({
-                'sources': sources
-            })
+            page = int(request.args.get('page', 1))
+            page_size = min(int(request.args.get('page_size', 100)), 1000)
+            with_stats = request.args.get('stats', 'false').lower() == 'true'
+            
+            return jsonify(app.comparator.list_available_sources(page, page_size, with_stats))
             
         except Exception as e:
             return jsonify({
                 'error': str(e)
             }), 500
 
+    @app.route('/sources/<path:source>', methods=['GET'])
+    def source_details(source):
+        """Endpoint to get per-source stats"""
+        if not app.comparator:
+            return jsonify({
+                'error': 'System not properly initialized'
+            }), 500
+        
+        stats = app.comparator.source_stats(source)
+        if stats is None:
+            return jsonify({
+                'error': f'Unknown source: {source}'
+            }), 404
+        return jsonify(stats)
+
     return app
 
 class LawComparison:
@@ -110,21 +136,24 @@ class LawComparison:
         os.environ['GOOGLE_API_KEY'] = os.getenv("GOOGLE_API_KEY")
         
         # Initialize models
-        self.embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
         self.llm = GoogleGenerativeAI(model="gemini-1.5-flash", temperature=0.1)
         
-        # Load the vector store
+        # Load the vector store with the embedding backend it was built with
         try:
-            self.vectors = FAISS.load_local("my_vector_store", self.embeddings, allow_dangerous_deserialization=True)
+            self.vectors = load_vector_store("my_vector_store")
+            self.embeddings = self.vectors.embeddings
+            # Source metadata is indexed once here instead of being searched per request
+            self.catalog = load_catalog("my_vector_store", self.vectors)
+            self.searcher = FilteredSearcher(self.vectors, fields=('source',))
             print("Vector store loaded successfully")
         except Exception as e:
             raise Exception(f"Error loading vector store: {str(e)}")
     
-    def search_law(self, query, k=2):
-        """Search for relevant law documents"""
+    def search_law(self, query, k=2, sources=None):
+        """Search for relevant law documents, optionally restricted to some sources"""
         try:
             # Search using similarity search
-            docs_and_scores = self.vectors.similarity_search_with_score(query, k=k)
+            docs_and_scores = self.searcher.search(query, k=k, sources=sources)
             
             results = []
             for doc, score in docs_and_scores:
@@ -175,23 +204,13 @@ Focus solely on explaining how the law has changed from one version to the next.
         except Exception as e:
             return f"Error during comparison: {str(e)}"
     
-    def list_available_sources(self):
-        """List all available source documents"""
-        try:
-            # Get all documents
-            all_docs = self.vectors.similarity_search("", k=1000)  # Adjust k as needed
-            
-            # Extract unique source files
-            sources = set()
-            for doc in all_docs:
-                if 'source' in doc.metadata:
-                    sources.add(doc.metadata['source'])
-            
-            return sorted(list(sources))
-            
-        except Exception as e:
-            print(f"Error listing sources: {str(e)}")
-            return []
+    def list_available_sources(self, page=1, page_size=100, with_stats=False):
+        """List available source documents from the metadata catalog"""
+        return self.catalog.page(page, page_size, with_stats)
+    
+    def source_stats(self, source):
+        """Chunk count, page range and categories for one source"""
+        return self.catalog.stats(source)
 
 if __name__ == '__main__':
     app = create_app()
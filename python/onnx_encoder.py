@@ -0,0 +1,158 @@
+"""ONNX Runtime inference path for sentence-transformer encoders on CPU-only boxes.
+
+The exported graph contains the transformer, mean pooling and L2
+normalization, so one session.run returns final sentence embeddings as
+NumPy. Export once, optionally with dynamic int8 quantization:
+
+    python onnx_encoder.py --model all-MiniLM-L6-v2 --output onnx/all-MiniLM-L6-v2
+
+then set RISK_ENCODER_BACKEND=onnx (and ONNX_ENCODER_DIR if the output
+directory differs) for the risk services.
+"""
+import argparse
+import json
+import os
+from typing import Optional, Sequence, Union
+
+import numpy as np
+
+ONNX_MODEL_FILE = 'model.onnx'
+QUANTIZED_MODEL_FILE = 'model.int8.onnx'
+ONNX_CONFIG_FILE = 'encoder.json'
+
+
+def export_onnx(model_name: str, output_dir: str, quantize: bool = True, opset: int = 14) -> str:
+    """Export a sentence-transformer with fused pooling/normalization, plus an int8 copy"""
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    encoder = SentenceTransformer(model_name, device='cpu')
+    transformer = encoder[0].auto_model
+    normalize = any(type(module).__name__ == 'Normalize' for module in encoder)
+
+    class PooledEncoder(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.transformer = transformer
+
+        def forward(self, input_ids, attention_mask):
+            token_embeddings = self.transformer(input_ids=input_ids, attention_mask=attention_mask)[0]
+            mask = attention_mask.unsqueeze(-1).to(token_embeddings.dtype)
+            pooled = (token_embeddings * mask).sum(1) / mask.sum(1).clamp(min=1e-9)
+            if normalize:
+                pooled = torch.nn.functional.normalize(pooled, p=2, dim=1)
+            return pooled
+
+    os.makedirs(output_dir, exist_ok=True)
+    model_path = os.path.join(output_dir, ONNX_MODEL_FILE)
+    sample = encoder.tokenizer(['an example clause'], return_tensors='pt', padding=True)
+    with torch.no_grad():
+        torch.onnx.export(
+            PooledEncoder().eval(),
+            (sample['input_ids'], sample['attention_mask']),
+            model_path,
+            input_names=['input_ids', 'attention_mask'],
+            output_names=['sentence_embedding'],
+            dynamic_axes={
+                'input_ids': {0: 'batch', 1: 'sequence'},
+                'attention_mask': {0: 'batch', 1: 'sequence'},
+                'sentence_embedding': {0: 'batch'}
+            },
+            opset_version=opset
+        )
+    encoder.tokenizer.save_pretrained(output_dir)
+    with open(os.path.join(output_dir, ONNX_CONFIG_FILE), 'w') as f:
+        json.dump({
+            'model': model_name,
+            'normalized': normalize,
+            'max_seq_length': encoder.max_seq_length,
+            'dimension': encoder.get_sentence_embedding_dimension()
+        }, f)
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(model_path, os.path.join(output_dir, QUANTIZED_MODEL_FILE), weight_type=QuantType.QInt8)
+    return output_dir
+
+
+class OnnxEncoder:
+    """SentenceTransformer.encode-compatible encoder running an exported ONNX graph"""
+    backend = 'onnx'
+
+    def __init__(self, model_dir: str, quantized: bool = True, batch_size: int = 64,
+                 threads: Optional[int] = None):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        with open(os.path.join(model_dir, ONNX_CONFIG_FILE)) as f:
+            config = json.load(f)
+        model_path = os.path.join(model_dir, QUANTIZED_MODEL_FILE)
+        # Fall back to the fp32 export when no quantized copy was produced
+        self.quantized = quantized and os.path.exists(model_path)
+        if not self.quantized:
+            model_path = os.path.join(model_dir, ONNX_MODEL_FILE)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.model_name = config['model']
+        self.normalized = config['normalized']
+        self.max_seq_length = config['max_seq_length']
+        self.dimension = config['dimension']
+        self.batch_size = batch_size
+
+    @classmethod
+    def from_env(cls, model_name: str = 'all-MiniLM-L6-v2') -> 'OnnxEncoder':
+        """Configured through ONNX_ENCODER_DIR, ONNX_QUANTIZED and ONNX_THREADS"""
+        threads = os.getenv('ONNX_THREADS')
+        return cls(
+            os.getenv('ONNX_ENCODER_DIR', os.path.join('onnx', model_name)),
+            quantized=os.getenv('ONNX_QUANTIZED', 'true').lower() != 'false',
+            threads=int(threads) if threads else None
+        )
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def encode(self, sentences: Union[str, Sequence[str]], batch_size: Optional[int] = None,
+               convert_to_numpy: bool = True, normalize_embeddings: bool = False,
+               show_progress_bar: bool = False, **kwargs) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        batch_size = batch_size or self.batch_size
+        embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+
+        # Longest first so each batch pads to a similar length
+        order = sorted(range(len(texts)), key=lambda i: -len(texts[i]))
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            encoded = self.tokenizer(
+                [texts[i] for i in batch],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors='np'
+            )
+            embeddings[batch] = self.session.run(None, {
+                'input_ids': encoded['input_ids'].astype(np.int64),
+                'attention_mask': encoded['attention_mask'].astype(np.int64)
+            })[0]
+
+        if normalize_embeddings and not self.normalized:
+            embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        return embeddings[0] if single else embeddings
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Export a sentence-transformer to ONNX (+ int8)")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--output", default=None, help="Output directory (default: onnx/<model>)")
+    parser.add_argument("--no-quantize", action="store_true", help="Only write the fp32 graph")
+    args = parser.parse_args()
+
+    output = export_onnx(args.model, args.output or os.path.join('onnx', args.model),
+                         quantize=not args.no_quantize)
+    print(f"Exported {args.model} to {output}")
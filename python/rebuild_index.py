@@ -0,0 +1,72 @@
+"""Re-embed an existing FAISS store with a different embedding backend.
+
+Usage:
+    python rebuild_index.py faiss_index faiss_index_local --backend local
+"""
+import argparse
+import time
+from typing import List
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import Embeddings
+
+from embeddings import get_embeddings
+from vector_store import load_vector_store, save_vector_store
+
+
+class _NoEmbeddings(Embeddings):
+    """Placeholder used to open a store without contacting its original backend"""
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        raise RuntimeError("Source store embeddings are not available during a rebuild")
+
+    def embed_query(self, text: str) -> List[float]:
+        raise RuntimeError("Source store embeddings are not available during a rebuild")
+
+
+def rebuild_index(source_path: str, target_path: str, backend: str,
+                  model_name: str = None, batch_size: int = 256) -> FAISS:
+    """Copy every document of source_path into a new store embedded with the given backend"""
+    source = load_vector_store(source_path, _NoEmbeddings(), index_name="index")
+    embeddings = get_embeddings(backend, model_name)
+
+    # Preserve the original docstore ids so external references stay valid
+    ids = [source.index_to_docstore_id[i] for i in range(source.index.ntotal)]
+    docs = [source.docstore.search(doc_id) for doc_id in ids]
+    print(f"Re-embedding {len(docs)} documents with the {backend} backend")
+
+    target = None
+    for start in range(0, len(docs), batch_size):
+        batch = docs[start:start + batch_size]
+        batch_ids = ids[start:start + batch_size]
+        texts = [doc.page_content for doc in batch]
+        metadatas = [doc.metadata for doc in batch]
+        vectors = embeddings.embed_documents(texts)
+        pairs = list(zip(texts, vectors))
+        if target is None:
+            target = FAISS.from_embeddings(pairs, embeddings, metadatas=metadatas, ids=batch_ids)
+        else:
+            target.add_embeddings(pairs, metadatas=metadatas, ids=batch_ids)
+        print(f"  {min(start + batch_size, len(docs))}/{len(docs)}")
+
+    if target is None:
+        raise ValueError(f"No documents found in {source_path}")
+    save_vector_store(target, target_path)
+    return target
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild a FAISS store with another embedding backend")
+    parser.add_argument("source", help="Existing vector store directory")
+    parser.add_argument("target", help="Directory to write the rebuilt store to")
+    parser.add_argument("--backend", choices=["local", "google"], default="local")
+    parser.add_argument("--model", default=None, help="Embedding model name")
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    store = rebuild_index(args.source, args.target, args.backend, args.model, args.batch_size)
+    print(f"Saved {store.index.ntotal} vectors to {args.target} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import defaultdict
+from typing import Any, Callable, Dict, Optional, Union
+
+_MISSING = object()
+
+
+def normalize_text(text: str) -> str:
+    """Normalize unicode and whitespace so cosmetic OCR differences hit the same entry"""
+    return ' '.join(unicodedata.normalize('NFC', str(text)).split())
+
+
+def version_tag(*parts) -> str:
+    """Fingerprint model names, prompt templates and settings into a short version string"""
+    digest = hashlib.sha256('\x1f'.join(str(p) for p in parts).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+class ResultCache:
+    """Content-addressed, SQLite-backed cache for per-section pipeline results"""
+    def __init__(self, path: str = 'result_cache.sqlite', max_bytes: int = 256 * 1024 * 1024,
+                 default_ttl: float = 7 * 24 * 3600, ttls: Optional[Dict[str, float]] = None,
+                 versions: Optional[Dict[str, Union[str, Callable[[], str]]]] = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.ttls = ttls or {}
+        self.versions = versions or {}
+        self.hits = defaultdict(int)
+        self.misses = defaultdict(int)
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS results ('
+            ' key TEXT PRIMARY KEY,'
+            ' section TEXT NOT NULL,'
+            ' value TEXT NOT NULL,'
+            ' size INTEGER NOT NULL,'
+            ' expires_at REAL NOT NULL,'
+            ' accessed_at REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed_at)')
+
+    @classmethod
+    def from_env(cls, versions: Optional[Dict[str, Union[str, Callable[[], str]]]] = None, ttls: Optional[Dict[str, float]] = None):
+        """Build a cache configured through RESULT_CACHE_* environment variables"""
+        return cls(
+            path=os.getenv('RESULT_CACHE_PATH', 'result_cache.sqlite'),
+            max_bytes=int(os.getenv('RESULT_CACHE_MAX_MB', '256')) * 1024 * 1024,
+            default_ttl=float(os.getenv('RESULT_CACHE_TTL_SECONDS', str(7 * 24 * 3600))),
+            ttls=ttls,
+            versions=versions
+        )
+
+    def version(self, section: str) -> str:
+        """Section version; callables are resolved on first use so models can load lazily"""
+        version = self.versions.get(section, '')
+        if callable(version):
+            version = self.versions[section] = version()
+        return version
+
+    def key(self, text: str, section: str) -> str:
+        content = '\x1f'.join([section, self.version(section), normalize_text(text)])
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def get(self, text: str, section: str, default: Any = None) -> Any:
+        """Return the cached value for a section, or default on a miss or expiry"""
+        key = self.key(text, section)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value, expires_at FROM results WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None or row[1] < now:
+                if row is not None:
+                    self._conn.execute('DELETE FROM results WHERE key = ?', (key,))
+                self.misses[section] += 1
+                return default
+            self._conn.execute('UPDATE results SET accessed_at = ? WHERE key = ?', (now, key))
+            self.hits[section] += 1
+        return json.loads(row[0])
+
+    def set(self, text: str, section: str, value: Any, ttl: Optional[float] = None):
+        """Store a section result and evict least recently used entries over the size cap"""
+        payload = json.dumps(value)
+        size = len(payload.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        ttl = ttl if ttl is not None else self.ttls.get(section, self.default_ttl)
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO results (key, section, value, size, expires_at, accessed_at)'
+                ' VALUES (?, ?, ?, ?, ?, ?)',
+                (self.key(text, section), section, payload, size, now + ttl, now)
+            )
+            self._evict(now)
+
+    def _evict(self, now: float):
+        self._conn.execute('DELETE FROM results WHERE expires_at < ?', (now,))
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        while total > self.max_bytes:
+            rows = self._conn.execute(
+                'SELECT key, size FROM results ORDER BY accessed_at ASC LIMIT 64'
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                self._conn.execute('DELETE FROM results WHERE key = ?', (key,))
+                self.evictions += 1
+                total -= size
+                if total <= self.max_bytes:
+                    break
+
+    def get_or_compute(self, text: str, section: str, compute: Callable[[], Any],
+                       should_cache: Callable[[Any], bool] = lambda value: value is not None) -> Any:
+        """Return the cached section, computing and storing it only on a miss"""
+        value = self.get(text, section, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = compute()
+        if should_cache(value):
+            self.set(text, section, value)
+        return value
+
+    def stats(self) -> Dict:
+        with self._lock:
+            entries, size = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results'
+            ).fetchone()
+        sections = sorted(set(self.hits) | set(self.misses))
+        return {
+            'entries': entries,
+            'bytes': size,
+            'max_bytes': self.max_bytes,
+            'evictions': self.evictions,
+            'sections': {
+                section: {
+                    'hits': self.hits[section],
+                    'misses': self.misses[section],
+                    'hit_rate': self.hits[section] / max(1, self.hits[section] + self.misses[section])
+                } for section in sections
+            }
+        }
@@ -0,0 +1,136 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+
+from catalog import iter_metadata
+
+# Metadata fields that get a sorted position array per distinct value
+FILTER_FIELDS = ('category', 'source')
+# Matches below ntotal / BATCH_SELECTOR_RATIO are hashed (IDSelectorBatch); larger sets use a bitmap
+BATCH_SELECTOR_RATIO = 256
+# Combined selectors kept for repeated filter combinations
+SELECTOR_CACHE_SIZE = 256
+
+
+class FilteredSearcher:
+    """Metadata-filtered FAISS search driven by per-value position lists and cached ID selectors.
+
+    Each value stores the sorted index positions carrying it, so memory is
+    O(N) per field whatever the number of values. Lists are built on first
+    use, and a filter combination's selector is built once and reused.
+    """
+    def __init__(self, store, fields: Iterable[str] = FILTER_FIELDS):
+        self.store = store
+        self.fields = tuple(fields)
+        self._positions: Optional[Dict[str, Dict[str, np.ndarray]]] = None
+        self._selectors: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def positions(self) -> Dict[str, Dict[str, np.ndarray]]:
+        if self._positions is None:
+            with self._lock:
+                if self._positions is None:
+                    self._positions = self.build()
+        return self._positions
+
+    def build(self) -> Dict[str, Dict[str, np.ndarray]]:
+        """Walk the docstore once and record which index positions carry each value"""
+        collected: Dict[str, Dict[str, List[int]]] = {field: {} for field in self.fields}
+        for position, _, metadata in iter_metadata(self.store):
+            for field in self.fields:
+                value = metadata.get(field)
+                if value is not None:
+                    collected[field].setdefault(value, []).append(position)
+        return {
+            field: {value: np.unique(np.asarray(rows, dtype=np.int64)) for value, rows in values.items()}
+            for field, values in collected.items()
+        }
+
+    def values(self, field: str) -> List[str]:
+        return sorted(self.positions.get(field, {}))
+
+    @staticmethod
+    def filter_key(filters: Dict[str, Optional[List[str]]]) -> Tuple:
+        """Order-independent key of the non-empty filters; empty means unfiltered"""
+        return tuple(sorted(
+            (field, tuple(sorted(set(wanted)))) for field, wanted in filters.items() if wanted
+        ))
+
+    def positions_for(self, key: Tuple) -> np.ndarray:
+        """Union the position lists within a field and intersect them across fields"""
+        combined = None
+        for field, wanted in key:
+            lists = [self.positions.get(field, {}).get(value) for value in wanted]
+            lists = [rows for rows in lists if rows is not None]
+            field_rows = np.unique(np.concatenate(lists)) if lists else np.empty(0, dtype=np.int64)
+            combined = field_rows if combined is None else np.intersect1d(combined, field_rows, assume_unique=True)
+        return combined
+
+    def selector(self, positions: np.ndarray):
+        """Build a FAISS selector over index positions; returns (selector, arrays it points into)"""
+        ntotal = self.store.index.ntotal
+        if len(positions) * BATCH_SELECTOR_RATIO < ntotal:
+            # IDSelectorBatch copies the ids into its own hash set
+            return faiss.IDSelectorBatch(len(positions), faiss.swig_ptr(positions)), None
+        # Bit i is (bitmap[i >> 3] >> (i & 7)) & 1
+        bitmap = np.zeros((ntotal + 7) // 8, dtype=np.uint8)
+        np.bitwise_or.at(bitmap, positions >> 3, (1 << (positions & 7)).astype(np.uint8))
+        # The selector only holds a raw pointer, so the bitmap must outlive it
+        return faiss.IDSelectorBitmap(ntotal, faiss.swig_ptr(bitmap)), bitmap
+
+    def selector_for(self, key: Tuple):
+        """Return (selector, backing array, match count) for a filter key, cached per combination"""
+        with self._lock:
+            cached = self._selectors.get(key)
+            if cached is not None:
+                self._selectors.move_to_end(key)
+                return cached
+        positions = self.positions_for(key)
+        selector, backing = self.selector(positions) if len(positions) else (None, None)
+        entry = (selector, backing, len(positions))
+        with self._lock:
+            self._selectors[key] = entry
+            while len(self._selectors) > SELECTOR_CACHE_SIZE:
+                self._selectors.popitem(last=False)
+        return entry
+
+    def search_params(self, selector):
+        """Carry the index's own nprobe / efSearch through, since per-call params replace them"""
+        index = self.store.index
+        ivf = faiss.try_extract_index_ivf(index)
+        if ivf is not None:
+            return faiss.SearchParametersIVF(sel=selector, nprobe=ivf.nprobe)
+        if hasattr(index, 'hnsw'):
+            return faiss.SearchParametersHNSW(sel=selector, efSearch=index.hnsw.efSearch)
+        return faiss.SearchParameters(sel=selector)
+
+    def search(self, query: str, k: int = 5, categories: Optional[List[str]] = None,
+               sources: Optional[List[str]] = None) -> List[Tuple[Document, float]]:
+        """Nearest neighbours of query restricted to documents matching the filters"""
+        key = self.filter_key({'category': categories, 'source': sources})
+        if not key:
+            return self.store.similarity_search_with_score(query, k=k)
+        # Holding the bitmap keeps it alive even if the cache evicts this entry mid-search
+        selector, bitmap, matches = self.selector_for(key)
+        if not matches:
+            return []
+
+        vector = np.array([self.store.embeddings.embed_query(query)], dtype=np.float32)
+        if getattr(self.store, '_normalize_L2', False):
+            faiss.normalize_L2(vector)
+        distances, indices = self.store.index.search(
+            vector, min(k, matches), params=self.search_params(selector)
+        )
+
+        results = []
+        for position, distance in zip(indices[0], distances[0]):
+            if position == -1:
+                continue
+            doc = self.store.docstore.search(self.store.index_to_docstore_id[int(position)])
+            results.append((doc, float(distance)))
+        return results
@@ -0,0 +1,70 @@
+import os
+from typing import Dict, List, Optional, Sequence
+
+import joblib
+import numpy as np
+
+from text_processing import preprocess_text
+
+
+class RiskScorer:
+    """Score clause risk in batches instead of one encode + predict per clause"""
+    def __init__(self, classifier, encoder, batch_size: int = 64):
+        self.classifier = classifier
+        self.encoder = encoder
+        self.batch_size = batch_size
+
+    @classmethod
+    def from_paths(cls, classifier_path: str = './risk_classifier.pkl',
+                   model_name: str = 'all-MiniLM-L6-v2', batch_size: int = 64,
+                   backend: Optional[str] = None):
+        """Load the joblib classifier and the sentence transformer used to train it"""
+        if not os.path.exists(classifier_path):
+            raise FileNotFoundError(f"Classifier model file not found at {classifier_path}")
+        from model_client import get_encoder
+
+        classifier = joblib.load(classifier_path)
+        # Served by model_server.py when MODEL_SERVER_URL is set; RISK_ENCODER_BACKEND=onnx
+        # runs the exported int8 graph from onnx_encoder.py on CPU
+        encoder = get_encoder(model_name, backend or os.getenv('RISK_ENCODER_BACKEND', 'torch'))
+        return cls(classifier, encoder, batch_size=batch_size)
+
+    def encode(self, clauses: Sequence[str]) -> np.ndarray:
+        """Embed all clauses, letting the encoder split them into size-bounded batches"""
+        processed = [preprocess_text(clause) for clause in clauses]
+        embeddings = self.encoder.encode(
+            processed,
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+        return np.asarray(embeddings, dtype=np.float32)
+
+    def predict(self, embeddings: np.ndarray):
+        """Run one vectorized predict / predict_proba over the embedding matrix"""
+        labels = self.classifier.predict(embeddings)
+        probabilities: Optional[np.ndarray] = None
+        if hasattr(self.classifier, 'predict_proba'):
+            probabilities = self.classifier.predict_proba(embeddings)
+        return labels, probabilities
+
+    def score(self, clauses: Sequence[str]) -> List[Dict]:
+        """Return the risk label and per-class probabilities for every clause"""
+        if not clauses:
+            return []
+
+        labels, probabilities = self.predict(self.encode(clauses))
+        classes = [str(c) for c in getattr(self.classifier, 'classes_', [])]
+
+        results = []
+        for i, label in enumerate(labels):
+            result = {'risk_level': str(label)}
+            if probabilities is not None:
+                result['probabilities'] = {
+                    cls: float(p) for cls, p in zip(classes, probabilities[i])
+                }
+            results.append(result)
+        return results
+
+    def score_one(self, clause_text: str) -> Dict:
+        return self.score([clause_text])[0]
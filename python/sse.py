@@ -0,0 +1,13 @@
+import json
+from typing import Any
+
+# Headers that stop proxies and browsers from buffering an event stream
+SSE_HEADERS = {
+    'Cache-Control': 'no-cache',
+    'X-Accel-Buffering': 'no'
+}
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Encode a payload as a single Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
@@ -1,15 +1,21 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from typing import List, Optional
 import uvicorn
 import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from typing import List, Dict
+from typing import AsyncIterator, List, Dict
 from dataclasses import dataclass
-from langchain_community.vectorstores import FAISS
-from langchain_google_genai import GoogleGenerativeAI, GoogleGenerativeAIEmbeddings
+from langchain_google_genai import GoogleGenerativeAI
 from langchain.prompts import PromptTemplate
 from langchain.chains import LLMChain
+from sse import SSE_HEADERS, format_sse
+from vector_store import load_vector_store
+from retrieval import FilteredSearcher
+from embeddings import cache_stats
 
 # Load environment variables
 load_dotenv()
@@ -36,6 +42,14 @@ class SituationRequest(BaseModel):
         le=10,
         description="Number of similar cases to retrieve"
     )
+    categories: Optional[List[str]] = Field(
+        default=None,
+        description="Only retrieve cases from these categories"
+    )
+    sources: Optional[List[str]] = Field(
+        default=None,
+        description="Only retrieve cases from these source documents"
+    )
 
 class CaseReference(BaseModel):
     case_source: str
@@ -52,14 +66,32 @@ class AdviceResponse(BaseModel):
 # Global advisor instance
 legal_advisor = None
 
+DISCLAIMER = """
+            IMPORTANT DISCLAIMER:
+            This analysis is provided for informational purposes only and should not be considered as legal advice. 
+            The recommendations are based on similar historical cases but may not fully apply to your specific situation. 
+            Please consult with qualified legal professionals before taking any action. 
+            The accuracy of case references and citations should be independently verified.
+            """
+
+# Bound in-flight advice requests and how long each may take
+ADVICE_MAX_CONCURRENCY = int(os.getenv("ADVICE_MAX_CONCURRENCY", "16"))
+ADVICE_TIMEOUT_SECONDS = float(os.getenv("ADVICE_TIMEOUT_SECONDS", "60"))
+ADVICE_QUEUE_TIMEOUT_SECONDS = float(os.getenv("ADVICE_QUEUE_TIMEOUT_SECONDS", "5"))
+advice_semaphore = asyncio.Semaphore(ADVICE_MAX_CONCURRENCY)
+
+# FAISS search and query embedding are blocking, so they run off the event loop
+retrieval_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("RETRIEVAL_WORKERS", "4")),
+    thread_name_prefix="retrieval"
+)
+
 class LegalCaseAdvisor:
     def __init__(self, vector_store_path: str):
         """Initialize the advisor with a path to the saved vector store"""
-        self.vector_store = FAISS.load_local(
-            vector_store_path,
-            GoogleGenerativeAIEmbeddings(model="models/embedding-001"),
-            allow_dangerous_deserialization=True
-        )
+        self.vector_store = load_vector_store(vector_store_path)
+        # Category/source bitmaps so filtered queries never over-fetch
+        self.searcher = FilteredSearcher(self.vector_store)
         
         self.llm = GoogleGenerativeAI(
             model="gemini-1.5-flash",
@@ -91,8 +123,10 @@ class LegalCaseAdvisor:
         
         self.chain = LLMChain(llm=self.llm, prompt=self.analysis_prompt)
 
-    def get_relevant_cases(self, query: str, num_cases: int = 5) -> List[CaseReference]:
-        results = self.vector_store.similarity_search(query, k=num_cases)
+    def get_relevant_cases(self, query: str, num_cases: int = 5,
+                           categories: Optional[List[str]] = None,
+                           sources: Optional[List[str]] = None) -> List[CaseReference]:
+        results = [doc for doc, _ in self.searcher.search(query, num_cases, categories, sources)]
         cases = []
         for doc in results:
             case = CaseReference(
@@ -113,9 +147,28 @@ class LegalCaseAdvisor:
             formatted_cases.append(formatted_case)
         return "\n".join(formatted_cases)
 
-    def get_advice(self, situation_summary: str, num_cases: int = 5) -> Dict:
+    def build_response(self, relevant_cases: List[CaseReference], analysis: str) -> Dict:
+        return {
+            "success": True,
+            "analysis": analysis,
+            "cases_referenced": [case.case_source for case in relevant_cases],
+            "disclaimer": DISCLAIMER,
+            "error": None
+        }
+
+    def build_error(self, error: str) -> Dict:
+        return {
+            "success": False,
+            "analysis": None,
+            "cases_referenced": None,
+            "disclaimer": "An error occurred while generating advice. Please try again.",
+            "error": error
+        }
+
+    def get_advice(self, situation_summary: str, num_cases: int = 5,
+                   categories: Optional[List[str]] = None, sources: Optional[List[str]] = None) -> Dict:
         try:
-            relevant_cases = self.get_relevant_cases(situation_summary, num_cases)
+            relevant_cases = self.get_relevant_cases(situation_summary, num_cases, categories, sources)
             formatted_cases = self.format_cases_for_prompt(relevant_cases)
             
             response = self.chain.run({
@@ -123,30 +176,58 @@ class LegalCaseAdvisor:
                 "relevant_cases": formatted_cases
             })
             
-            disclaimer = """
-            IMPORTANT DISCLAIMER:
-            This analysis is provided for informational purposes only and should not be considered as legal advice. 
-            The recommendations are based on similar historical cases but may not fully apply to your specific situation. 
-            Please consult with qualified legal professionals before taking any action. 
-            The accuracy of case references and citations should be independently verified.
-            """
+            return self.build_response(relevant_cases, response)
             
-            return {
-                "success": True,
-                "analysis": response,
-                "cases_referenced": [case.case_source for case in relevant_cases],
-                "disclaimer": disclaimer,
-                "error": None
-            }
+        except Exception as e:
+            return self.build_error(str(e))
+
+    async def aget_advice(self, situation_summary: str, num_cases: int = 5,
+                          categories: Optional[List[str]] = None,
+                          sources: Optional[List[str]] = None) -> Dict:
+        """Non-blocking advice: retrieval on an executor, LLM call through the async client"""
+        try:
+            loop = asyncio.get_running_loop()
+            relevant_cases = await loop.run_in_executor(
+                retrieval_executor, self.get_relevant_cases, situation_summary, num_cases,
+                categories, sources
+            )
+            formatted_cases = self.format_cases_for_prompt(relevant_cases)
+            
+            response = await self.chain.arun({
+                "situation": situation_summary,
+                "relevant_cases": formatted_cases
+            })
+            
+            return self.build_response(relevant_cases, response)
+            
+        except Exception as e:
+            return self.build_error(str(e))
+
+    async def astream_advice(self, situation_summary: str, num_cases: int = 5,
+                             categories: Optional[List[str]] = None,
+                             sources: Optional[List[str]] = None) -> AsyncIterator[str]:
+        """Stream SSE messages: retrieved cases first, then LLM tokens as they arrive"""
+        try:
+            loop = asyncio.get_running_loop()
+            relevant_cases = await loop.run_in_executor(
+                retrieval_executor, self.get_relevant_cases, situation_summary, num_cases,
+                categories, sources
+            )
+            yield format_sse("cases", {
+                "cases_referenced": [case.case_source for case in relevant_cases]
+            })
+            
+            prompt = self.analysis_prompt.format(
+                situation=situation_summary,
+                relevant_cases=self.format_cases_for_prompt(relevant_cases)
+            )
+            async for token in self.llm.astream(prompt):
+                yield format_sse("token", {"text": token})
+            
+            yield format_sse("done", {"disclaimer": DISCLAIMER})
             
         except Exception as e:
-            return {
-                "success": False,
-                "analysis": None,
-                "cases_referenced": None,
-                "disclaimer": "An error occurred while generating advice. Please try again.",
-                "error": str(e)
-            }
+            yield format_sse("error", self.build_error(str(e)))
 
 # Startup event to initialize the advisor
 @app.on_event("startup")
@@ -161,7 +242,21 @@ async def startup_event():
 # Health check endpoint
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "vector_store": legal_advisor is not None}
+    return {
+        "status": "healthy",
+        "vector_store": legal_advisor is not None,
+        "embedding_cache": cache_stats(legal_advisor.vector_store.embeddings) if legal_advisor else None
+    }
+
+# Filter values accepted by the advice endpoints
+@app.get("/filters")
+async def list_filters():
+    if legal_advisor is None:
+        raise HTTPException(status_code=503, detail="Legal advisor not initialized")
+    return {
+        "categories": legal_advisor.searcher.values("category"),
+        "sources": legal_advisor.searcher.values("source")
+    }
 
 # Main advice endpoint
 @app.post("/advice", response_model=AdviceResponse)
@@ -169,14 +264,76 @@ async def get_advice(request: SituationRequest):
     if legal_advisor is None:
         raise HTTPException(status_code=503, detail="Legal advisor not initialized")
     
+    # Shed load instead of queueing unboundedly behind slow LLM calls
     try:
-        result = legal_advisor.get_advice(
-            request.situation_summary,
-            request.num_cases
+        await asyncio.wait_for(advice_semaphore.acquire(), timeout=ADVICE_QUEUE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail="Too many concurrent advice requests")
+    
+    try:
+        result = await asyncio.wait_for(
+            legal_advisor.aget_advice(
+                request.situation_summary,
+                request.num_cases,
+                request.categories,
+                request.sources
+            ),
+            timeout=ADVICE_TIMEOUT_SECONDS
         )
         return AdviceResponse(**result)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Advice generation timed out")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        advice_semaphore.release()
+
+# Streaming advice endpoint (Server-Sent Events)
+@app.post("/advice/stream")
+async def stream_advice(request: SituationRequest):
+    if legal_advisor is None:
+        raise HTTPException(status_code=503, detail="Legal advisor not initialized")
+    
+    async def events():
+        # The concurrency slot is taken inside the stream, so a response that is never
+        # iterated (client gone before the body starts) cannot hold one
+        loop = asyncio.get_running_loop()
+        acquired = False
+        stream = None
+        try:
+            try:
+                await asyncio.wait_for(advice_semaphore.acquire(), timeout=ADVICE_QUEUE_TIMEOUT_SECONDS)
+                acquired = True
+            except asyncio.TimeoutError:
+                yield format_sse("error", legal_advisor.build_error("Too many concurrent advice requests"))
+                return
+            
+            stream = legal_advisor.astream_advice(
+                request.situation_summary,
+                request.num_cases,
+                request.categories,
+                request.sources
+            )
+            # ADVICE_TIMEOUT_SECONDS bounds the whole stream, as it bounds /advice
+            deadline = loop.time() + ADVICE_TIMEOUT_SECONDS
+            while True:
+                try:
+                    message = await asyncio.wait_for(
+                        stream.__anext__(), timeout=max(0.0, deadline - loop.time())
+                    )
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    yield format_sse("error", legal_advisor.build_error("Advice generation timed out"))
+                    break
+                yield message
+        finally:
+            if stream is not None:
+                await stream.aclose()
+            if acquired:
+                advice_semaphore.release()
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
 
 if __name__ == "__main__":
     uvicorn.run(
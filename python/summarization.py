@@ -0,0 +1,135 @@
+import os
+from typing import List, Optional, Sequence
+
+from chunking import TokenChunker
+from result_cache import version_tag
+
+
+class LegalSummarizer:
+    """Batched, length-bucketed summarization over a transformers summarization pipeline"""
+    def __init__(self, summarizer, batch_size: int = 4, max_length: int = 150,
+                 min_length: int = 30, min_chunk_words: int = 10,
+                 hierarchical: bool = False, max_reduce_rounds: int = 3,
+                 chunk_overlap: int = 0):
+        self.summarizer = summarizer
+        self.batch_size = max(1, batch_size)
+        self.max_length = max_length
+        self.min_length = min_length
+        self.min_chunk_words = min_chunk_words
+        self.hierarchical = hierarchical
+        self.max_reduce_rounds = max_reduce_rounds
+        self.chunker = TokenChunker(
+            self.tokenizer,
+            max_tokens=self.max_input_tokens,
+            overlap_tokens=chunk_overlap
+        )
+
+    @classmethod
+    def from_env(cls, summarizer):
+        """Build a summarizer configured through SUMMARIZER_* environment variables"""
+        return cls(
+            summarizer,
+            batch_size=int(os.getenv('SUMMARIZER_BATCH_SIZE', '4')),
+            hierarchical=os.getenv('SUMMARIZER_MODE', 'flat').lower() == 'hierarchical',
+            chunk_overlap=int(os.getenv('SUMMARIZER_CHUNK_OVERLAP', '0'))
+        )
+
+    @property
+    def version(self) -> str:
+        """Identify the model and settings that produced a summary, for result caching"""
+        model = getattr(getattr(self.summarizer, 'model', None), 'name_or_path', '')
+        if getattr(self.summarizer, 'quantized', False):
+            model += '+int8'
+        return version_tag(model, self.max_length, self.min_length,
+                           self.hierarchical, self.chunker.overlap_tokens)
+
+    @property
+    def tokenizer(self):
+        return getattr(self.summarizer, 'tokenizer', None)
+
+    @property
+    def max_input_tokens(self) -> int:
+        limit = getattr(self.tokenizer, 'model_max_length', None)
+        # Some tokenizers report a huge sentinel when no limit is configured
+        if not limit or limit > 100_000:
+            return 1024
+        return limit
+
+    def token_length(self, text: str) -> int:
+        if self.tokenizer is None:
+            return len(text.split())
+        return len(self.tokenizer(text, add_special_tokens=False)['input_ids'])
+
+    def summarize_chunks(self, chunks: Sequence[str]) -> List[str]:
+        """Summarize chunks in batches of similar token length, preserving input order"""
+        if not chunks:
+            return []
+
+        lengths = [self.token_length(chunk) for chunk in chunks]
+        # Bucket by length so each batch pads to a similar size
+        order = sorted(range(len(chunks)), key=lambda i: lengths[i])
+
+        summaries: List[Optional[str]] = [None] * len(chunks)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            outputs = self.summarizer(
+                [chunks[i] for i in batch],
+                batch_size=len(batch),
+                max_length=self.max_length,
+                min_length=self.min_length,
+                do_sample=False,
+                truncation=True
+            )
+            for i, output in zip(batch, outputs):
+                # Pipelines may wrap each result in a single-element list
+                if isinstance(output, list):
+                    output = output[0]
+                summaries[i] = output['summary_text']
+        return summaries
+
+    def group_by_budget(self, texts: Sequence[str], budget: int) -> List[str]:
+        """Concatenate consecutive texts into groups that fit the model's token budget"""
+        groups = []
+        current = []
+        current_tokens = 0
+        for text in texts:
+            tokens = self.token_length(text)
+            if current and current_tokens + tokens > budget:
+                groups.append(' '.join(current))
+                current = []
+                current_tokens = 0
+            current.append(text)
+            current_tokens += tokens
+        if current:
+            groups.append(' '.join(current))
+        return groups
+
+    def reduce(self, summaries: List[str]) -> List[str]:
+        """Re-summarize chunk summaries until they collapse into a single bounded summary"""
+        budget = self.max_input_tokens
+        for _ in range(self.max_reduce_rounds):
+            if len(summaries) <= 1:
+                break
+            summaries = self.summarize_chunks(self.group_by_budget(summaries, budget))
+        if len(summaries) > 1:
+            summaries = self.summarize_chunks([' '.join(summaries)])
+        return summaries
+
+    def summarize(self, text: str, chunks: Optional[Sequence[str]] = None) -> str:
+        """Summarize a full document, optionally in map-reduce mode"""
+        if chunks is None:
+            chunks = self.chunker.chunks(text)
+        # Skip empty or very short chunks
+        chunks = [chunk for chunk in chunks if len(chunk.split()) >= self.min_chunk_words]
+
+        summaries = self.summarize_chunks(chunks)
+        if self.hierarchical:
+            summaries = self.reduce(summaries)
+
+        final_summary = ' '.join(summaries)
+
+        # If the text was very short and didn't need chunking
+        if not final_summary and text:
+            final_summary = self.summarize_chunks([text])[0]
+
+        return final_summary
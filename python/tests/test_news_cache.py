@@ -0,0 +1,133 @@
+"""GNews caching and coalescing in news.py, checked against gnews_stub.py"""
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('flask')
+pytest.importorskip('requests')
+pytest.importorskip('geoip2')
+pytest.importorskip('maxminddb')
+
+import requests
+from werkzeug.serving import make_server
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import gnews_stub
+import news
+
+TTL_SECONDS = 0.5
+
+
+@pytest.fixture(scope='module')
+def stub_url():
+    server = make_server('127.0.0.1', 0, gnews_stub.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+
+
+@pytest.fixture
+def stub(stub_url):
+    requests.delete(f'{stub_url}/stats')
+    requests.post(f'{stub_url}/control', json={'latency_ms': 200, 'fail_status': None})
+    yield stub_url
+    requests.post(f'{stub_url}/control', json={'latency_ms': 200, 'fail_status': None})
+
+
+@pytest.fixture
+def client(stub, monkeypatch):
+    monkeypatch.setenv('GNEWS_BASE_URL', f'{stub}/api/v4/search')
+    monkeypatch.setenv('NEWS_CACHE_TTL_SECONDS', str(TTL_SECONDS))
+    monkeypatch.setenv('NEWS_CACHE_STALE_SECONDS', '60')
+    # A fresh fetcher per test so each one starts with an empty cache
+    monkeypatch.setattr(news, 'news_fetcher', news.LegalNewsFetcher(api_key='test'))
+    return news.app.test_client()
+
+
+def upstream_calls(stub):
+    return requests.get(f'{stub}/stats').json()['total']
+
+
+def get_news(client, page=1):
+    response = client.get(f'/api/news?page={page}&pageSize=5')
+    assert response.status_code == 200
+    result = response.get_json()
+    assert result['success'], result
+    return result['data']
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_later_pages_are_served_from_the_cache(client, stub):
+    first = get_news(client, page=1)
+    assert first['meta']['cache'] == 'miss'
+    total_pages = first['meta']['pagination']['total_pages']
+    assert total_pages > 1
+
+    for page in range(2, total_pages + 1):
+        data = get_news(client, page=page)
+        assert data['meta']['cache'] == 'fresh'
+        assert data['articles'][0]['id'] == (page - 1) * 5 + 1
+
+    assert upstream_calls(stub) == 1
+
+
+def test_concurrent_requests_share_one_upstream_call(client, stub):
+    requests.post(f'{stub}/control', json={'latency_ms': 500})
+    statuses = []
+    statuses_lock = threading.Lock()
+
+    def fetch():
+        # The Flask test client is not thread-safe; each thread uses its own
+        status = get_news(news.app.test_client())['meta']['cache']
+        with statuses_lock:
+            statuses.append(status)
+
+    threads = [threading.Thread(target=fetch) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert upstream_calls(stub) == 1
+    assert sorted(statuses) == ['coalesced'] * 7 + ['miss']
+
+
+def test_stale_entry_is_served_while_refreshing(client, stub):
+    get_news(client)
+    requests.post(f'{stub}/control', json={'latency_ms': 1000})
+    time.sleep(TTL_SECONDS + 0.1)
+
+    start = time.monotonic()
+    data = get_news(client)
+    assert data['meta']['cache'] == 'stale'
+    # Answered from the cache, not after the slow upstream call
+    assert time.monotonic() - start < 0.5
+
+    assert wait_for(lambda: upstream_calls(stub) == 2)
+    assert wait_for(lambda: news.news_fetcher.cache.stats()['inflight'] == 0)
+    assert get_news(client)['meta']['cache'] == 'fresh'
+
+
+def test_failed_refresh_keeps_the_stale_entry(client, stub):
+    articles = get_news(client)['articles']
+    requests.post(f'{stub}/control', json={'fail_status': 403, 'latency_ms': 0})
+    time.sleep(TTL_SECONDS + 0.1)
+
+    assert get_news(client)['meta']['cache'] == 'stale'
+    assert wait_for(lambda: news.news_fetcher.cache.stats()['refresh_errors'] == 1)
+
+    data = get_news(client)
+    assert data['meta']['cache'] == 'stale'
+    assert data['articles'] == articles
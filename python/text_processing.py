@@ -0,0 +1,66 @@
+import re
+from typing import Iterator, List, NamedTuple, Optional
+
+# Common legal document clause markers (numbers, letters, or specific keywords)
+CLAUSE_MARKERS = r'(?:\d+\.|\([a-z]\)|\bARTICLE\b|\bSECTION\b|\bCLAUSE\b)'
+
+# Compiled once; zero-width, so every position where a marker starts is a clause boundary,
+# exactly as re.split(f"(?={CLAUSE_MARKERS})") splits
+CLAUSE_START = re.compile(f'(?={CLAUSE_MARKERS})')
+
+# Runs of anything that is not an ASCII letter; a run becomes one space if it holds whitespace
+NON_ALPHA_RUN = re.compile(r'[^a-z]+')
+WHITESPACE = re.compile(r'\s')
+
+
+class ClauseSpan(NamedTuple):
+    """Offsets of a clause in the text it was segmented from, whitespace-trimmed"""
+    start: int
+    end: int
+
+
+def normalize_whitespace(text: str) -> str:
+    """Collapse all whitespace runs to single spaces and trim the ends"""
+    return ' '.join(text.split())
+
+
+def _separator(match: re.Match) -> str:
+    return ' ' if WHITESPACE.search(match.group()) else ''
+
+
+def preprocess_text(text) -> str:
+    """Lowercase, drop non-letters and collapse whitespace in a single regex pass.
+
+    Equivalent to re.sub(r'[^a-zA-Z\\s]', '', text.lower()) followed by
+    ' '.join(...split()), which is what the risk classifier was trained on.
+    """
+    return NON_ALPHA_RUN.sub(_separator, str(text).lower()).strip()
+
+
+def _trimmed(text: str, start: int, end: int) -> Optional[ClauseSpan]:
+    # Trim surrounding whitespace by moving the offsets, not by slicing
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return ClauseSpan(start, end) if start < end else None
+
+
+def clause_spans(text: str) -> Iterator[ClauseSpan]:
+    """Yield the span of every non-empty clause without copying the text"""
+    start = 0
+    for match in CLAUSE_START.finditer(text):
+        span = _trimmed(text, start, match.start())
+        if span:
+            yield span
+        start = match.start()
+    span = _trimmed(text, start, len(text))
+    if span:
+        yield span
+
+
+def split_into_clauses(text: str, spans: Optional[List[ClauseSpan]] = None) -> List[str]:
+    """Materialize clause strings, e.g. for batching into the encoder"""
+    if spans is None:
+        spans = clause_spans(text)
+    return [text[start:end] for start, end in spans]
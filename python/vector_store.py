@@ -0,0 +1,168 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import faiss
+from langchain_community.docstore.base import Docstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from ann_index import configure_from_env, read_ann_config
+from catalog import SourceCatalog
+from embeddings import embedding_config_of, embeddings_for_store, write_embedding_config
+
+# Documents and the position -> id mapping live here instead of a pickled index.pkl
+DOCSTORE_FILE = 'docstore.sqlite'
+
+DOCSTORE_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS documents ('
+    ' id TEXT PRIMARY KEY,'
+    ' position INTEGER,'
+    ' page_content TEXT NOT NULL,'
+    ' metadata TEXT NOT NULL)'
+)
+
+
+class SQLiteDocstore(Docstore):
+    """Docstore that reads documents lazily by id from SQLite"""
+    def __init__(self, path: str, read_only: bool = True):
+        self.path = path
+        self._lock = threading.Lock()
+        if read_only:
+            self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(DOCSTORE_SCHEMA)
+            self._conn.commit()
+
+    def search(self, search: str):
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT page_content, metadata FROM documents WHERE id = ?', (search,)
+            ).fetchone()
+        if row is None:
+            # Same contract as InMemoryDocstore
+            return f"ID {search} not found."
+        return Document(page_content=row[0], metadata=json.loads(row[1]))
+
+    def add(self, texts: Dict[str, Document]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO documents (id, position, page_content, metadata)'
+                ' VALUES (?, NULL, ?, ?)',
+                [(doc_id, doc.page_content, json.dumps(doc.metadata)) for doc_id, doc in texts.items()]
+            )
+            self._conn.commit()
+
+    def delete(self, ids: List) -> None:
+        with self._lock:
+            self._conn.executemany('DELETE FROM documents WHERE id = ?', [(doc_id,) for doc_id in ids])
+            self._conn.commit()
+
+    def index_mapping(self) -> Dict[int, str]:
+        """Read the index position -> docstore id mapping without touching document bodies"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT position, id FROM documents WHERE position IS NOT NULL'
+            ).fetchall()
+        return dict(rows)
+
+    def iter_metadata(self) -> Iterator[Tuple[str, Dict]]:
+        """Yield (id, metadata) pairs without page content, for building catalogs and filters"""
+        with self._lock:
+            rows = self._conn.execute('SELECT id, metadata FROM documents').fetchall()
+        for doc_id, metadata in rows:
+            yield doc_id, json.loads(metadata)
+
+
+def read_index(path: str, mmap: bool = True) -> faiss.Index:
+    """Read a FAISS index, memory-mapping it when the index type supports it"""
+    if mmap:
+        flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY | getattr(faiss, 'IO_FLAG_MMAP_IFC', 0)
+        try:
+            return faiss.read_index(path, flags)
+        except RuntimeError:
+            pass
+    return faiss.read_index(path)
+
+
+def load_vector_store(store_path: str, embeddings: Optional[Embeddings] = None, encoder=None,
+                      index_name: Optional[str] = None, writable: bool = False,
+                      encoder_model: Optional[str] = None) -> FAISS:
+    """Load a FAISS store with the embedding backend it was built with"""
+    if embeddings is None:
+        embeddings = embeddings_for_store(store_path, encoder=encoder, encoder_model=encoder_model)
+    # FAISS_INDEX_NAME switches services to an ANN variant built by ann_index.py
+    index_name = index_name or os.getenv('FAISS_INDEX_NAME', 'index')
+
+    docstore_path = os.path.join(store_path, DOCSTORE_FILE)
+    if os.path.exists(docstore_path):
+        # Read-only services mmap the index so processes share pages through the OS cache
+        index = read_index(os.path.join(store_path, f"{index_name}.faiss"), mmap=not writable)
+        docstore = SQLiteDocstore(docstore_path, read_only=not writable)
+        store = FAISS(embeddings, index, docstore, docstore.index_mapping())
+    elif os.getenv('ALLOW_PICKLE_STORE', 'false').lower() == 'true':
+        store = FAISS.load_local(store_path, embeddings, index_name=index_name,
+                                 allow_dangerous_deserialization=True)
+    else:
+        raise FileNotFoundError(
+            f"{docstore_path} not found. Convert the legacy pickle store once with "
+            f"'python vector_store.py {store_path}' or set ALLOW_PICKLE_STORE=true"
+        )
+
+    configure_from_env(store.index, read_ann_config(store_path, index_name))
+    return store
+
+
+def write_docstore(store: FAISS, store_path: str):
+    """Write the store's documents and position mapping to a fresh SQLite docstore"""
+    final_path = os.path.join(store_path, DOCSTORE_FILE)
+    tmp_path = final_path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    conn.execute(DOCSTORE_SCHEMA)
+    rows = []
+    for position, doc_id in store.index_to_docstore_id.items():
+        doc = store.docstore.search(doc_id)
+        if isinstance(doc, str):
+            continue
+        rows.append((doc_id, position, doc.page_content, json.dumps(doc.metadata)))
+        if len(rows) >= 1000:
+            conn.executemany('INSERT INTO documents VALUES (?, ?, ?, ?)', rows)
+            rows = []
+    conn.executemany('INSERT INTO documents VALUES (?, ?, ?, ?)', rows)
+    conn.execute('CREATE UNIQUE INDEX documents_position ON documents (position)')
+    conn.commit()
+    conn.close()
+    # Readers holding the old file keep their snapshot until they reopen
+    os.replace(tmp_path, final_path)
+
+
+def save_vector_store(store: FAISS, store_path: str, index_name: str = 'index'):
+    """Save a FAISS store with its SQLite docstore, embedding backend and source catalog"""
+    os.makedirs(store_path, exist_ok=True)
+    faiss.write_index(store.index, os.path.join(store_path, f"{index_name}.faiss"))
+    write_docstore(store, store_path)
+    config = embedding_config_of(store.embeddings)
+    write_embedding_config(store_path, config['backend'], config['model'], store.index.d)
+    SourceCatalog.from_store(store).save(store_path)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert a pickled FAISS store to the SQLite + mmap format")
+    parser.add_argument("store", help="Vector store directory containing index.faiss / index.pkl")
+    args = parser.parse_args()
+
+    # The one place a trusted legacy pickle is read
+    from rebuild_index import _NoEmbeddings
+    legacy = FAISS.load_local(args.store, _NoEmbeddings(), allow_dangerous_deserialization=True)
+    write_docstore(legacy, args.store)
+    SourceCatalog.from_store(legacy).save(args.store)
+    print(f"Wrote {DOCSTORE_FILE} for {legacy.index.ntotal} vectors; index.pkl is no longer needed")
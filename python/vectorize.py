@@ -1,19 +1,26 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
-from transformers import pipeline
 import torch
-from typing import List, Dict
+from text_processing import clause_spans, normalize_whitespace, split_into_clauses
+from summarization import LegalSummarizer
+from typing import Iterator, List, Dict, Optional
 from dataclasses import dataclass
-from langchain_community.vectorstores import FAISS
-from langchain_google_genai import GoogleGenerativeAI, GoogleGenerativeAIEmbeddings
+from langchain_google_genai import GoogleGenerativeAI
 from langchain.prompts import PromptTemplate
 from langchain.chains import LLMChain
 from dotenv import load_dotenv
+import json
 import os
-import re
-import joblib
-from sentence_transformers import SentenceTransformer
-import numpy as np
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from risk_engine import RiskScorer
+from result_cache import ResultCache, version_tag
+from sse import SSE_HEADERS, format_sse
+from vector_store import load_vector_store
+from retrieval import FilteredSearcher
+from embeddings import cache_stats as embedding_cache_stats
+from model_registry import ModelDisabledError, ModelRegistry
+from model_client import encoder_variant, get_summarizer
 
 # Load environment variables
 load_dotenv()
@@ -36,48 +43,30 @@ CORS(app, resources={
     }
 })
 
-# Initialize models
-summarizer = pipeline(
-    "summarization",
-    model="facebook/bart-large-cnn",
-    device=0 if torch.cuda.is_available() else -1
-)
+RISK_CLASSIFIER_PATH = './risk_classifier.pkl'
+RISK_ENCODER_MODEL = 'all-MiniLM-L6-v2'
+ADVICE_MODEL = "gemini-1.5-flash"
 
-# Load risk assessment models
-classifier_path = './risk_classifier.pkl'
-if os.path.exists(classifier_path):
-    classifier = joblib.load(classifier_path)
-else:
-    raise FileNotFoundError(f"Classifier model file not found at {classifier_path}")
+def load_summarizer() -> LegalSummarizer:
+    # transformers is only imported when the summarizer is actually needed, and not
+    # at all for the weights when MODEL_SERVER_URL points at model_server.py.
+    # SUMMARIZER_TIER picks bart-large (default), distilbart or distilbart-int8
+    return LegalSummarizer.from_env(get_summarizer())
 
-sentence_transformer = SentenceTransformer('all-MiniLM-L6-v2')
+# Models load on first use; MODELS_DISABLED=summarizer,advisor gives a risk-only service
+models = ModelRegistry.from_env()
+models.register('risk', lambda: RiskScorer.from_paths(RISK_CLASSIFIER_PATH, RISK_ENCODER_MODEL))
+models.register('summarizer', load_summarizer, optional=True)
 
-@dataclass
-class CaseReference:
-    case_source: str
-    category: str
-    relevant_text: str
-    pdf_path: str
+DISCLAIMER = """
+            IMPORTANT DISCLAIMER:
+            This analysis is provided for informational purposes only and should not be considered as legal advice. 
+            The recommendations are based on similar historical cases but may not fully apply to your specific situation. 
+            Please consult with qualified legal professionals before taking any action. 
+            The accuracy of case references and citations should be independently verified.
+            """
 
-class LegalCaseAdvisor:
-    def __init__(self, vector_store_path: str):
-        self.vector_store = FAISS.load_local(
-            vector_store_path,
-            GoogleGenerativeAIEmbeddings(model="models/embedding-001"),
-            allow_dangerous_deserialization=True
-        )
-        
-        self.llm = GoogleGenerativeAI(
-            model="gemini-1.5-flash",
-            temperature=0.3,
-            top_p=0.8,
-            top_k=40,
-            max_output_tokens=2048
-        )
-        
-        self.analysis_prompt = PromptTemplate(
-            input_variables=["situation", "relevant_cases"],
-            template="""
+ANALYSIS_TEMPLATE = """
             
             Analyze the following situation and provide actionable steps based on similar cases:
 
@@ -100,12 +89,47 @@ class LegalCaseAdvisor:
             and give links to indiankanoon website at the end
             Format the response in a clear, structured way with case citations inline
             """
+
+@dataclass
+class CaseReference:
+    case_source: str
+    category: str
+    relevant_text: str
+    pdf_path: str
+
+class LegalCaseAdvisor:
+    def __init__(self, vector_store_path: str):
+        # Reuse the MiniLM encoder already loaded for risk scoring when the store was indexed
+        # locally with the same model, unless it is the int8 ONNX one (local, or as reported
+        # by the model server) whose vectors drift slightly from the indexed ones
+        encoder = models.get('risk').encoder
+        self.vector_store = load_vector_store(
+            vector_store_path,
+            encoder=None if getattr(encoder, 'quantized', False) else encoder,
+            encoder_model=RISK_ENCODER_MODEL
+        )
+        # Category/source bitmaps so filtered queries never over-fetch
+        self.searcher = FilteredSearcher(self.vector_store)
+        
+        self.llm = GoogleGenerativeAI(
+            model=ADVICE_MODEL,
+            temperature=0.3,
+            top_p=0.8,
+            top_k=40,
+            max_output_tokens=2048
+        )
+        
+        self.analysis_prompt = PromptTemplate(
+            input_variables=["situation", "relevant_cases"],
+            template=ANALYSIS_TEMPLATE
         )
         
         self.chain = LLMChain(llm=self.llm, prompt=self.analysis_prompt)
 
-    def get_relevant_cases(self, query: str, num_cases: int = 5) -> List[CaseReference]:
-        results = self.vector_store.similarity_search(query, k=num_cases)
+    def get_relevant_cases(self, query: str, num_cases: int = 5,
+                           categories: Optional[List[str]] = None,
+                           sources: Optional[List[str]] = None) -> List[CaseReference]:
+        results = [doc for doc, _ in self.searcher.search(query, num_cases, categories, sources)]
         cases = []
         for doc in results:
             case = CaseReference(
@@ -117,6 +141,15 @@ class LegalCaseAdvisor:
             cases.append(case)
         return cases
 
+    def cases_referenced(self, cases: List[CaseReference]) -> List[Dict]:
+        return [
+            {
+                "source": case.case_source,
+                "category": case.category,
+                "pdf_path": case.pdf_path
+            } for case in cases
+        ]
+
     def format_cases_for_prompt(self, cases: List[CaseReference]) -> str:
         formatted_cases = []
         for i, case in enumerate(cases, 1):
@@ -127,9 +160,10 @@ class LegalCaseAdvisor:
             formatted_cases.append(formatted_case)
         return "\n".join(formatted_cases)
 
-    def get_advice(self, situation_summary: str) -> Dict:
+    def get_advice(self, situation_summary: str, categories: Optional[List[str]] = None,
+                   sources: Optional[List[str]] = None) -> Dict:
         try:
-            relevant_cases = self.get_relevant_cases(situation_summary)
+            relevant_cases = self.get_relevant_cases(situation_summary, categories=categories, sources=sources)
             formatted_cases = self.format_cases_for_prompt(relevant_cases)
             
             response = self.chain.run({
@@ -137,25 +171,11 @@ class LegalCaseAdvisor:
                 "relevant_cases": formatted_cases
             })
             
-            disclaimer = """
-            IMPORTANT DISCLAIMER:
-            This analysis is provided for informational purposes only and should not be considered as legal advice. 
-            The recommendations are based on similar historical cases but may not fully apply to your specific situation. 
-            Please consult with qualified legal professionals before taking any action. 
-            The accuracy of case references and citations should be independently verified.
-            """
-            
             return {
                 "success": True,
                 "analysis": response,
-                "cases_referenced": [
-                    {
-                        "source": case.case_source,
-                        "category": case.category,
-                        "pdf_path": case.pdf_path
-                    } for case in relevant_cases
-                ],
-                "disclaimer": disclaimer
+                "cases_referenced": self.cases_referenced(relevant_cases),
+                "disclaimer": DISCLAIMER
             }
             
         except Exception as e:
@@ -165,80 +185,103 @@ class LegalCaseAdvisor:
                 "disclaimer": "An error occurred while generating advice. Please try again."
             }
 
-# Initialize legal advisor
-legal_advisor = LegalCaseAdvisor("faiss_index")
+    def stream_advice(self, situation_summary: str, categories: Optional[List[str]] = None,
+                      sources: Optional[List[str]] = None) -> Iterator[str]:
+        """Yield SSE messages: retrieved cases first, then LLM tokens as they arrive"""
+        try:
+            relevant_cases = self.get_relevant_cases(situation_summary, categories=categories, sources=sources)
+            yield format_sse("cases", {
+                "cases_referenced": self.cases_referenced(relevant_cases)
+            })
+            
+            prompt = self.analysis_prompt.format(
+                situation=situation_summary,
+                relevant_cases=self.format_cases_for_prompt(relevant_cases)
+            )
+            for token in self.llm.stream(prompt):
+                yield format_sse("token", {"text": token})
+            
+            yield format_sse("done", {"disclaimer": DISCLAIMER})
+            
+        except Exception as e:
+            yield format_sse("error", {
+                "success": False,
+                "error": str(e),
+                "disclaimer": "An error occurred while generating advice. Please try again."
+            })
 
-def preprocess_text(text):
-    """Clean and preprocess the text data."""
-    text = str(text).lower()
-    text = re.sub(r'[^a-zA-Z\s]', '', text)
-    text = ' '.join(text.split())
-    return text
+models.register('advisor', lambda: LegalCaseAdvisor("faiss_index"), optional=True)
+
+# Cache results per section, keyed on the document text plus model and prompt versions;
+# model-derived versions are resolved lazily so caching does not force a load at startup
+result_cache = ResultCache.from_env(
+    versions={
+        'summary': lambda: models.get('summarizer').version,
+        'advice': lambda: version_tag(models.get('summarizer').version, ADVICE_MODEL, ANALYSIS_TEMPLATE),
+        # The encoder variant (torch, onnx, onnx-int8) changes the embeddings the classifier sees
+        'risk': lambda: version_tag(
+            RISK_ENCODER_MODEL, os.path.getmtime(RISK_CLASSIFIER_PATH), 'spans',
+            encoder_variant(models.get('risk').encoder)
+        )
+    },
+    ttls={'advice': 24 * 3600}
+)
+
+# Run independent /api/analyze stages concurrently unless ANALYZE_PIPELINED is disabled
+pipelined = os.getenv('ANALYZE_PIPELINED', 'true').lower() != 'false'
+stage_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('ANALYZE_WORKERS', '4')),
+    thread_name_prefix='analyze-stage'
+)
+
+def run_stage(timings, stage, fn) -> Future:
+    """Run a pipeline stage on the executor (or inline) and record its wall time"""
+    def timed():
+        start = time.perf_counter()
+        try:
+            return fn()
+        finally:
+            timings[stage] = round(time.perf_counter() - start, 3)
+
+    if pipelined:
+        return stage_executor.submit(timed)
+    future = Future()
+    try:
+        future.set_result(timed())
+    except Exception as e:
+        future.set_exception(e)
+    return future
 
 def analyze_clause_risk(clause_text):
     """Analyze a single clause and predict its risk level."""
-    processed_text = preprocess_text(clause_text)
-    embedding = sentence_transformer.encode([processed_text], convert_to_tensor=True)
-    risk_level = classifier.predict(embedding)[0]
-    return risk_level
-
-def split_into_clauses(text):
-    """Split text into clauses using common legal document markers."""
-    # Split on common clause markers (numbers, letters, or specific keywords)
-    clause_markers = r'(?:\d+\.|\([a-z]\)|\bARTICLE\b|\bSECTION\b|\bCLAUSE\b)'
-    clauses = re.split(f"(?={clause_markers})", text)
-    return [clause.strip() for clause in clauses if clause.strip()]
-
-def chunk_text(text, max_chunk_size=1024):
-    """Split text into chunks that the model can process"""
-    words = text.split()
-    chunks = []
-    current_chunk = []
-    current_size = 0
-    
-    for word in words:
-        if current_size + len(word) + 1 <= max_chunk_size:
-            current_chunk.append(word)
-            current_size += len(word) + 1
-        else:
-            chunks.append(' '.join(current_chunk))
-            current_chunk = [word]
-            current_size = len(word) + 1
-            
-    if current_chunk:
-        chunks.append(' '.join(current_chunk))
-        
-    return chunks
+    return models.get('risk').score_one(clause_text)['risk_level']
 
 def summarize_legal_document(text):
     """Summarize legal document text using BART model"""
     try:
-        chunks = chunk_text(text)
-        summaries = []
-        for chunk in chunks:
-            if len(chunk.split()) < 10:
-                continue
-            summary = summarizer(chunk, 
-                               max_length=150,
-                               min_length=30,
-                               do_sample=False)
-            summaries.append(summary[0]['summary_text'])
-        
-        final_summary = ' '.join(summaries)
-        
-        if not final_summary and text:
-            summary = summarizer(text,
-                               max_length=150,
-                               min_length=30,
-                               do_sample=False)
-            final_summary = summary[0]['summary_text']
-            
-        return final_summary
-
+        return models.get('summarizer').summarize(text)
     except Exception as e:
         print(f"Error in summarization: {str(e)}")
         return None
 
+def analyze_clauses(text):
+    """Split text into clauses and score the risk of each in one batch"""
+    # Spans are offsets into text (the response's original_text)
+    spans = list(clause_spans(text))
+    clauses = split_into_clauses(text, spans)
+    clause_analysis = []
+    
+    for i, (span, clause, risk) in enumerate(zip(spans, clauses, models.get('risk').score(clauses)), 1):
+        clause_analysis.append({
+            'clause_number': i,
+            'text': clause,
+            'start': span.start,
+            'end': span.end,
+            'risk_level': risk['risk_level'],
+            'probabilities': risk.get('probabilities')
+        })
+    return clause_analysis
+
 @app.route('/api/pdf/<path:pdf_path>')
 def serve_pdf(pdf_path):
     """Serve PDF files"""
@@ -252,37 +295,54 @@ def analyze_document():
     try:
         data = request.json
         ocr_text = data.get('text')
+        categories = data.get('categories')
+        sources = data.get('sources')
         
         if not ocr_text:
             return jsonify({
                 'error': 'No text provided'
             }), 400
 
-        # Clean the text
-        cleaned_text = ' '.join(ocr_text.split())
+        started = time.perf_counter()
+        timings = {}
 
-        # Generate summary
-        summary = summarize_legal_document(cleaned_text)
-        
-        if summary is None:
-            return jsonify({
-                'error': 'Failed to generate summary'
-            }), 500
+        # Clean the text once; clause spans and cache keys refer to this version
+        cleaned_text = normalize_whitespace(ocr_text)
 
-        # Get legal advice based on summary
-        advice = legal_advisor.get_advice(summary)
-        
-        # Split text into clauses and analyze risk for each
-        clauses = split_into_clauses(cleaned_text)
-        clause_analysis = []
-        
-        for i, clause in enumerate(clauses, 1):
-            risk_level = analyze_clause_risk(clause)
-            clause_analysis.append({
-                'clause_number': i,
-                'text': clause,
-                'risk_level': risk_level
-            })
+        # Clause risk only needs the text, so it overlaps with summarization
+        risk_future = run_stage(timings, 'risk', lambda: result_cache.get_or_compute(
+            cleaned_text, 'risk', lambda: analyze_clauses(cleaned_text)
+        ))
+
+        # Generate summary (skipped in a risk-only deployment)
+        summary = None
+        if models.enabled('summarizer'):
+            summary = run_stage(timings, 'summary', lambda: result_cache.get_or_compute(
+                cleaned_text, 'summary', lambda: summarize_legal_document(cleaned_text)
+            )).result()
+            
+            if summary is None:
+                return jsonify({
+                    'error': 'Failed to generate summary'
+                }), 500
+
+        # Get legal advice based on summary while clause scoring finishes
+        # Filters change the retrieved cases, so they are part of the advice cache key
+        advice_future = None
+        if summary is not None and models.enabled('advisor'):
+            advice_key = json.dumps({
+                'text': cleaned_text,
+                'categories': sorted(categories or []),
+                'sources': sorted(sources or [])
+            }, sort_keys=True)
+            advice_future = run_stage(timings, 'advice', lambda: result_cache.get_or_compute(
+                advice_key, 'advice', lambda: models.get('advisor').get_advice(summary, categories, sources),
+                should_cache=lambda result: result.get('success', False)
+            ))
+
+        clause_analysis = risk_future.result()
+        advice = advice_future.result() if advice_future else None
+        timings['total'] = round(time.perf_counter() - started, 3)
 
         # Calculate overall document risk level (e.g., highest risk among clauses)
         overall_risk = max(analysis['risk_level'] for analysis in clause_analysis)
@@ -295,7 +355,8 @@ def analyze_document():
             'risk_analysis': {
                 'overall_risk': overall_risk,
                 'clause_analysis': clause_analysis
-            }
+            },
+            'timings': timings
         })
 
     except Exception as e:
@@ -303,5 +364,50 @@ def analyze_document():
             'error': str(e)
         }), 500
 
+@app.route('/api/advice/stream', methods=['POST'])
+def stream_advice():
+    """Stream legal advice for a situation as Server-Sent Events"""
+    data = request.json or {}
+    situation = data.get('situation') or data.get('summary')
+    
+    if not situation:
+        return jsonify({
+            'error': 'No situation provided'
+        }), 400
+    
+    try:
+        legal_advisor = models.get('advisor')
+    except ModelDisabledError as e:
+        return jsonify({
+            'error': str(e)
+        }), 503
+    
+    return Response(
+        stream_with_context(legal_advisor.stream_advice(
+            situation, data.get('categories'), data.get('sources')
+        )),
+        mimetype='text/event-stream',
+        headers=SSE_HEADERS
+    )
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Report result cache size and hit/miss counters"""
+    embeddings = models.get('advisor').vector_store.embeddings if models.loaded('advisor') else None
+    return jsonify({
+        **result_cache.stats(),
+        'embeddings': embedding_cache_stats(embeddings) if embeddings else None
+    })
+
+@app.route('/api/health', methods=['GET'])
+def health():
+    """Per-model readiness; 503 until every enabled required model is loaded"""
+    status = models.status()
+    return jsonify(status), 200 if status['ready'] else 503
+
 if __name__ == '__main__':
+    # Warm models up in the background so the server binds immediately; the debug
+    # reloader imports this module twice and only the serving child should load them
+    if os.getenv('MODELS_WARMUP', 'true').lower() != 'false' and os.getenv('WERKZEUG_RUN_MAIN') == 'true':
+        models.warm_up()
     app.run(debug=True)
\ No newline at end of file